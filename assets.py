@@ -0,0 +1,58 @@
+import hashlib
+import os
+import re
+
+from flask import abort, send_from_directory, url_for
+from werkzeug.security import safe_join
+
+# Fingerprinted static assets: templates call asset_url('css/app.css') and get
+# /assets/css/app.<hash>.css. The name changes whenever the content does, so the
+# response can be cached forever.
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_HASH_LENGTH = 12
+_FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$' % _HASH_LENGTH)
+
+_hashes = {}
+
+
+def content_hash(static_folder, name, cached=True):
+    if cached and name in _hashes:
+        return _hashes[name]
+    with open(os.path.join(static_folder, name), 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:_HASH_LENGTH]
+    _hashes[name] = digest
+    return digest
+
+
+def fingerprinted_name(static_folder, name, cached=True):
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{content_hash(static_folder, name, cached)}{ext}'
+
+
+def init_assets(app):
+    def asset_url(name):
+        # Re-hash on every render while debugging so edits show up immediately
+        return url_for('asset', filename=fingerprinted_name(app.static_folder, name, cached=not app.debug))
+
+    @app.route('/assets/<path:filename>', endpoint='asset')
+    def asset(filename):
+        match = _FINGERPRINTED.match(filename)
+        if not match:
+            abort(404)
+        name = match['stem'] + match['ext']
+        if safe_join(app.static_folder, name) is None:
+            abort(404)
+        try:
+            current = content_hash(app.static_folder, name, cached=not app.debug)
+        except (FileNotFoundError, IsADirectoryError):
+            abort(404)
+        if current != match['hash']:
+            # A stale fingerprint must not be cached as immutable under the new content
+            abort(404)
+        response = send_from_directory(app.static_folder, name, max_age=31536000)
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    app.jinja_env.globals['asset_url'] = asset_url
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalize_description(text):
+    # Whitespace-only differences should not defeat the cache
+    return ' '.join((text or '').split())
+
+
+def response_cache_key(image_digest, description, prompt_version, model_name, generation_config,
+                       image_options=None):
+    payload = json.dumps(
+        [image_digest, normalize_description(description), prompt_version,
+         model_name, generation_config, image_options],
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry TTL and a total byte budget."""
+
+    def __init__(self, max_entries=1024, max_bytes=8 * 1024 * 1024, ttl=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _sizeof(value):
+        return len(value.encode('utf-8')) if isinstance(value, str) else len(json.dumps(value))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, size, value)
+            self._bytes += size
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _evict(self):
+        now = self._clock()
+        for key in [k for k, (exp, _, _) in self._entries.items() if exp <= now]:
+            self._remove(key)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for the leader's result or exception instead
+    of repeating the work. Nothing is remembered once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Return (future, is_leader). The leader must call finish() exactly once."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time. Returns (result, shared)."""
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result, False
+
+    async def do_async(self, key, fn):
+        """do() for a coroutine function; followers wait without blocking the event loop."""
+        import asyncio
+
+        future, leader = self.begin(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result, False
+
+    def __len__(self):
+        return len(self._calls)
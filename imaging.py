@@ -0,0 +1,139 @@
+import io
+
+# Pillow is imported inside the functions so routes that never touch images
+# don't pay for it at startup
+
+_EXIF_ORIENTATION = 0x0112
+
+# Images declaring more pixels than this are refused before decoding. Pillow's own default
+# still decodes up to ~178 MP (only warning above ~89 MP), enough to exhaust a small instance.
+MAX_DECODE_PIXELS = 50_000_000
+
+_OUTPUT_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+}
+
+
+def _open(data):
+    from PIL import Image
+
+    Image.MAX_IMAGE_PIXELS = MAX_DECODE_PIXELS
+    img = Image.open(io.BytesIO(data))
+    if img.width * img.height > MAX_DECODE_PIXELS:
+        raise Image.DecompressionBombError(f'{img.width}x{img.height} exceeds {MAX_DECODE_PIXELS} pixels')
+    return img
+
+
+def exceeds_pixel_limit(data):
+    """True when the image header declares more than MAX_DECODE_PIXELS (nothing is decoded)."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        _open(data)
+    except Image.DecompressionBombError:
+        return True
+    except (UnidentifiedImageError, OSError):
+        return False
+    return False
+
+
+def normalize_image(data, mime_type, max_side=1536, max_pixels=1536 * 1536, fmt='jpeg', quality=85):
+    """Decode, orient, downscale and re-encode an image before it goes to the model.
+
+    Returns (data, mime_type). The original bytes are returned when Pillow
+    can't decode them, or when nothing needed changing and re-encoding
+    would not make the payload smaller.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    pil_format, out_mime = _OUTPUT_FORMATS[fmt]
+    try:
+        img = _open(data)
+        # Let the JPEG decoder skip work by decoding at a reduced scale
+        img.draft('RGB', (max_side, max_side))
+        rotated = img.getexif().get(_EXIF_ORIENTATION, 1) != 1
+        img = ImageOps.exif_transpose(img)
+        # Decode here so truncated or corrupt data fails inside the try, not in resize()
+        img.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return data, mime_type
+
+    scale = min(1.0, max_side / max(img.size), (max_pixels / (img.width * img.height)) ** 0.5)
+    if scale < 1.0:
+        size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        img = img.resize(size, Image.LANCZOS)
+
+    if img.mode not in ('RGB', 'L'):
+        # Flatten transparency onto white; JPEG has no alpha channel
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        rgba = img.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        img = background
+
+    out = io.BytesIO()
+    img.save(out, format=pil_format, quality=quality)
+    encoded = out.getvalue()
+
+    if scale >= 1.0 and not rotated and len(encoded) >= len(data):
+        return data, mime_type
+    return encoded, out_mime
+
+
+def make_thumbnail(data, max_side=320, fmt='webp', quality=70):
+    """Small, EXIF-oriented preview of an upload for the results view.
+
+    Returns (data, mime_type), or None when Pillow can't decode the image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    pil_format, out_mime = _OUTPUT_FORMATS[fmt]
+    try:
+        img = _open(data)
+        img.draft('RGB', (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+
+    if img.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        rgba = img.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        img = background
+
+    out = io.BytesIO()
+    img.save(out, format=pil_format, quality=quality)
+    return out.getvalue(), out_mime
+
+
+# A hash with fewer set (or unset) bits than this comes from an image that is mostly one
+# gradient; unrelated photos under the same lighting would match it
+_MIN_HASH_DETAIL = 8
+
+
+def perceptual_hash(data, hash_size=8):
+    """64-bit difference hash (dHash) of an image, for spotting re-uploads of the same photo.
+
+    Each bit records whether a pixel of the grayscale image, shrunk to
+    (hash_size + 1) x hash_size, is brighter than its right-hand neighbour,
+    so re-encoding and resizing leave it (nearly) unchanged. Returns None
+    when Pillow can't decode the image or the hash carries too little detail.
+    """
+    import numpy as np
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        img = _open(data)
+        img.draft('L', (hash_size * 16, hash_size * 16))
+        img = ImageOps.exif_transpose(img).convert('L')
+        img = img.resize((hash_size + 1, hash_size), Image.LANCZOS)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        return None
+
+    pixels = np.asarray(img, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    detail = int(bits.sum())
+    if min(detail, bits.size - detail) < _MIN_HASH_DETAIL:
+        return None
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
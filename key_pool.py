@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolKey:
+    """One API key with its load and throttling history.
+
+    `client` and `models` are filled in by the caller on first use (a
+    client manager for the key and the GenerativeModels bound to it).
+    """
+
+    def __init__(self, index, api_key):
+        self.index = index
+        self.api_key = api_key
+        self.inflight = 0
+        self.throttled = deque()  # monotonic times of recent 429s
+        self.cooldown_until = 0.0
+        self.client = None
+        self.models = {}
+
+    @property
+    def label(self):
+        # Safe to log and to use as a metric label
+        return str(self.index)
+
+
+class KeyLease:
+    def __init__(self, pool, key):
+        self._pool = pool
+        self.key = key
+        self._released = False
+
+    def release(self, error=None):
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self.key, error)
+
+    def __enter__(self):
+        return self.key
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release(exc)
+        return False
+
+
+class KeyPool:
+    """Spreads model calls over several API keys.
+
+    Each call goes to the least-loaded key that is not cooling down, with
+    fewer recent 429s breaking ties. A 429 on a key (is_throttle(error))
+    benches it for `cooldown` seconds, doubling with every further 429
+    inside `window` seconds up to `max_cooldown`. When every key is
+    benched, the one that comes back soonest is used.
+    """
+
+    def __init__(self, api_keys, is_throttle, cooldown=5.0, max_cooldown=60.0, window=60.0,
+                 on_throttle=None, clock=time.monotonic):
+        if not api_keys:
+            raise ValueError('KeyPool needs at least one API key')
+        self.keys = [PoolKey(i, key) for i, key in enumerate(api_keys)]
+        self.is_throttle = is_throttle
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.window = window
+        self.on_throttle = on_throttle or (lambda key: None)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def acquire(self):
+        with self._lock:
+            now = self._clock()
+            for key in self.keys:
+                self._prune(key, now)
+            healthy = [k for k in self.keys if k.cooldown_until <= now]
+            if healthy:
+                key = min(healthy, key=lambda k: (k.inflight, len(k.throttled), k.index))
+            else:
+                key = min(self.keys, key=lambda k: (k.cooldown_until, k.inflight))
+            key.inflight += 1
+        return KeyLease(self, key)
+
+    def _prune(self, key, now):
+        while key.throttled and now - key.throttled[0] > self.window:
+            key.throttled.popleft()
+
+    def _release(self, key, error):
+        throttled = error is not None and self.is_throttle(error)
+        with self._lock:
+            key.inflight -= 1
+            if throttled:
+                now = self._clock()
+                self._prune(key, now)
+                key.throttled.append(now)
+                backoff = min(self.max_cooldown, self.cooldown * 2 ** (len(key.throttled) - 1))
+                key.cooldown_until = max(key.cooldown_until, now + backoff)
+        if throttled:
+            self.on_throttle(key)
+
+    def snapshot(self):
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    'key': key.label,
+                    'inflight': key.inflight,
+                    'recent_429s': len(key.throttled),
+                    'cooling_down': key.cooldown_until > now,
+                }
+                for key in self.keys
+            ]
@@ -0,0 +1,331 @@
+import math
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: each process keeps its own limit
+    fcntl = None
+
+# How often queued callers re-check for a free slot. Releases in this process
+# wake them immediately; releases in other workers are picked up by polling.
+_POLL_INTERVAL = 0.02
+
+# EWMA weights: recent latency (about the last 10 calls) is compared against a
+# long-term baseline (about the last 500), so ordinary variance doesn't read as congestion
+_RECENT_WEIGHT = 0.1
+_BASELINE_WEIGHT = 0.002
+# Latency isn't judged until the baseline has this many samples (the first call also pays for imports)
+_WARMUP_SAMPLES = 50
+
+
+class Overloaded(Exception):
+    """A model call could not be admitted before the queue deadline."""
+
+    def __init__(self, retry_after):
+        super().__init__(f'Model capacity exhausted; retry in {retry_after}s')
+        self.retry_after = retry_after
+
+
+class _Counts:
+    __slots__ = ('limit', 'avg_latency', 'baseline_latency', 'last_decrease', 'samples', 'inflight', 'queued')
+
+    def __init__(self, limit, avg_latency=0.0, baseline_latency=0.0, last_decrease=float('-inf'), samples=0,
+                 inflight=0, queued=0):
+        self.limit = limit
+        self.avg_latency = avg_latency
+        self.baseline_latency = baseline_latency
+        self.last_decrease = last_decrease
+        self.samples = samples
+        self.inflight = inflight
+        self.queued = queued
+
+
+class _LocalState:
+    def __init__(self, limit):
+        self._lock = threading.Lock()
+        self._counts = _Counts(limit)
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            yield self._counts
+
+
+_MAGIC = b'mdlimit2'
+_HEADER = struct.Struct('<8sddddq')  # magic, limit, avg_latency, baseline_latency, last_decrease, samples
+_ENTRY = struct.Struct('<iii')  # pid, inflight, queued
+_MAX_PROCESSES = 64
+_STATE_SIZE = _HEADER.size + _ENTRY.size * _MAX_PROCESSES
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _SharedState:
+    """Limiter state in a small file shared by every worker on the host.
+
+    The limit and latency estimates are global; in-flight and queued counts
+    are kept per process so a crashed worker's slots can be reclaimed.
+    """
+
+    def __init__(self, path, limit):
+        self.path = path
+        self._initial_limit = limit
+        self._lock = threading.Lock()
+        self._fd = None
+        self._fd_pid = None
+
+    def _file(self):
+        # flock is per open file; a forked worker must not share its parent's descriptor
+        pid = os.getpid()
+        if self._fd_pid != pid:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._fd_pid = pid
+        return self._fd
+
+    def _read(self, fd):
+        raw = os.pread(fd, _STATE_SIZE, 0)
+        if len(raw) != _STATE_SIZE or raw[:len(_MAGIC)] != _MAGIC:
+            return [self._initial_limit, 0.0, 0.0, float('-inf'), 0], [[0, 0, 0] for _ in range(_MAX_PROCESSES)]
+        _, *header = _HEADER.unpack_from(raw)
+        entries = [list(_ENTRY.unpack_from(raw, _HEADER.size + i * _ENTRY.size)) for i in range(_MAX_PROCESSES)]
+        return header, entries
+
+    def _own_entry(self, entries, pid):
+        own = free = None
+        for entry in entries:
+            if entry[0] == pid:
+                own = entry
+            elif entry[0] and not _pid_alive(entry[0]):
+                # Slots held by a worker that died are released
+                entry[:] = [0, 0, 0]
+            if free is None and entry[0] == 0:
+                free = entry
+        if own is not None:
+            return own
+        if free is None:
+            raise RuntimeError(f'More than {_MAX_PROCESSES} processes share {self.path}')
+        free[0] = pid
+        return free
+
+    @contextmanager
+    def locked(self):
+        with self._lock:
+            fd = self._file()
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                header, entries = self._read(fd)
+                own = self._own_entry(entries, os.getpid())
+                counts = _Counts(*header, sum(e[1] for e in entries), sum(e[2] for e in entries))
+                inflight, queued = counts.inflight, counts.queued
+                yield counts
+                own[1] += counts.inflight - inflight
+                own[2] += counts.queued - queued
+                raw = _HEADER.pack(_MAGIC, counts.limit, counts.avg_latency, counts.baseline_latency,
+                                   counts.last_decrease, counts.samples)
+                raw += b''.join(_ENTRY.pack(*entry) for entry in entries)
+                os.pwrite(fd, raw, 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class _Slot:
+    def __init__(self, limiter):
+        self._limiter = limiter
+        self._started = limiter._clock()
+        self._released = False
+
+    def release(self, error=None, sample=True):
+        """Free the slot. sample=False keeps its duration out of the latency estimates
+        (e.g. a stream held open for as long as the client reads)."""
+        # Idempotent, so a fallback close hook can call it safely
+        if self._released:
+            return
+        self._released = True
+        latency = self._limiter._clock() - self._started
+        self._limiter._release(latency if sample else None, error)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release(exc)
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        import asyncio
+
+        await asyncio.to_thread(self.release, exc)
+        return False
+
+
+class AdaptiveLimiter:
+    """Adaptive cap on concurrent model calls, with a bounded wait queue.
+
+    The limit grows by one per window of successful calls while demand
+    reaches it, and shrinks multiplicatively when the upstream signals
+    overload (is_overload(error)) or when recent latency rises past
+    latency_tolerance times its long-term average. It shrinks at most once
+    per average call latency, so one burst of slow or failed calls already
+    in flight counts as a single signal. Callers that can't get a
+    slot queue; acquire() raises Overloaded instead when the queue is full
+    or the expected wait exceeds queue_deadline seconds.
+
+    With state_path set (and fcntl available) every process on the host
+    shares one limit and one set of counts through that file.
+    """
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=64, max_queue=64, queue_deadline=10.0,
+                 latency_tolerance=2.0, backoff=0.7, is_overload=None, state_path=None,
+                 clock=time.monotonic):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_deadline = queue_deadline
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.is_overload = is_overload or (lambda error: False)
+        self._clock = clock
+        self._released = threading.Condition()
+        if state_path and fcntl is not None:
+            self._state = _SharedState(state_path, float(initial_limit))
+        else:
+            self._state = _LocalState(float(initial_limit))
+
+    def _try_enter(self, s):
+        if s.inflight < max(self.min_limit, int(s.limit)):
+            s.inflight += 1
+            return True
+        return False
+
+    def _admit(self):
+        with self._state.locked() as s:
+            # A state file left by a run with other bounds is pulled back within ours
+            s.limit = min(self.max_limit, max(self.min_limit, s.limit))
+            if self._try_enter(s):
+                return True
+            # Callers ahead of us drain at about `limit` per average call latency
+            expected_wait = (s.queued + 1) / max(s.limit, 1) * s.avg_latency
+            if s.queued >= self.max_queue or expected_wait > self.queue_deadline:
+                raise Overloaded(max(1, math.ceil(expected_wait)))
+            s.queued += 1
+            return False
+
+    def _wait_turn(self, deadline):
+        with self._state.locked() as s:
+            if self._try_enter(s):
+                s.queued -= 1
+                return True
+            if self._clock() >= deadline:
+                s.queued -= 1
+                raise Overloaded(max(1, math.ceil(s.avg_latency)))
+            return False
+
+    def _leave_queue(self):
+        with self._state.locked() as s:
+            s.queued = max(0, s.queued - 1)
+
+    def acquire(self):
+        """Block until a slot is free; use the returned slot as a context manager."""
+        if not self._admit():
+            deadline = self._clock() + self.queue_deadline
+            try:
+                while not self._wait_turn(deadline):
+                    with self._released:
+                        self._released.wait(_POLL_INTERVAL)
+            except Overloaded:
+                raise
+            except BaseException:
+                self._leave_queue()
+                raise
+        return _Slot(self)
+
+    async def acquire_async(self):
+        import asyncio
+
+        deadline = self._clock() + self.queue_deadline
+        entered = queued = False
+        try:
+            while True:
+                # Shared state is behind a flock other workers may hold, so each step runs in a
+                # thread. It is shielded: a cancelled caller still learns what the step did.
+                step = asyncio.ensure_future(
+                    asyncio.to_thread(self._wait_turn, deadline) if queued else asyncio.to_thread(self._admit)
+                )
+                try:
+                    entered = await asyncio.shield(step)
+                except asyncio.CancelledError:
+                    try:
+                        entered = await step
+                    except Overloaded:
+                        queued = False
+                    else:
+                        queued = not entered
+                    raise
+                if entered:
+                    return _Slot(self)
+                queued = True
+                await asyncio.sleep(_POLL_INTERVAL)
+        except Overloaded:
+            raise
+        except BaseException:
+            # Cancelled (e.g. a losing hedge): give back whatever place the caller held
+            if entered:
+                self._release(None, None)
+            elif queued:
+                self._leave_queue()
+            raise
+
+    def _decrease(self, s, factor):
+        now = self._clock()
+        if now - s.last_decrease < s.avg_latency:
+            return
+        s.limit = max(self.min_limit, s.limit * factor)
+        s.last_decrease = now
+
+    def _release(self, latency, error):
+        with self._state.locked() as s:
+            s.inflight = max(0, s.inflight - 1)
+            if error is not None:
+                if self.is_overload(error):
+                    self._decrease(s, self.backoff)
+            elif latency is not None:
+                s.samples += 1
+                if s.samples == 1:
+                    s.avg_latency = latency
+                s.avg_latency += _RECENT_WEIGHT * (latency - s.avg_latency)
+                # A plain mean until warmed up, then a slow EWMA that still relearns a lasting change
+                s.baseline_latency += max(_BASELINE_WEIGHT, 1 / s.samples) * (latency - s.baseline_latency)
+                if s.samples >= _WARMUP_SAMPLES and s.avg_latency > self.latency_tolerance * s.baseline_latency:
+                    self._decrease(s, 0.95)
+                elif s.inflight + 1 + s.queued >= int(s.limit):
+                    s.limit = min(self.max_limit, s.limit + 1 / s.limit)
+        with self._released:
+            self._released.notify_all()
+
+    def has_capacity(self):
+        with self._state.locked() as s:
+            return s.queued == 0 and s.inflight < max(self.min_limit, int(s.limit))
+
+    def snapshot(self):
+        with self._state.locked() as s:
+            return {
+                'limit': s.limit,
+                'inflight': s.inflight,
+                'queued': s.queued,
+                'avg_latency': s.avg_latency,
+            }
@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process metrics rendered in the Prometheus text exposition format.
+# Each worker process keeps its own numbers; scrape every worker.
+
+_DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}' for key, v in items]
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=_DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, key, [le])} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = Histogram(
+    'medassist_request_seconds', 'End-to-end request latency by endpoint and status.',
+    labelnames=('endpoint', 'status'),
+)
+STAGE_SECONDS = Histogram(
+    'medassist_stage_seconds',
+    'Latency of each analyze stage (parse, read, thumbnail, persist, image_setup, phash, queue, model, serialize).',
+    labelnames=('stage',),
+)
+MODEL_TOKENS = Counter(
+    'medassist_model_tokens_total', 'Tokens reported by usage_metadata, by kind (prompt, candidates, total).',
+    labelnames=('kind',),
+)
+MODEL_OUTPUT_TOKENS = Histogram(
+    'medassist_model_output_tokens', 'candidates_token_count per model response.',
+    buckets=(64, 128, 256, 384, 512, 768, 1024, 1536, 2048, 4096, 8192),
+)
+MODEL_FINISH_REASONS = Counter(
+    'medassist_model_finish_reasons_total', 'finish_reason of the first candidate of each model response.',
+    labelnames=('reason',),
+)
+MODEL_ERRORS = Counter(
+    'medassist_model_errors_total', 'Exceptions raised by model calls, by exception class.',
+    labelnames=('error',),
+)
+MODEL_OUTPUT_BUDGET = Gauge(
+    'medassist_model_output_budget_tokens', 'max_output_tokens currently sent with each model call.',
+)
+MODEL_TRUNCATED_RETRIES = Counter(
+    'medassist_model_truncated_retries_total', 'Answers cut off at the adaptive cap and regenerated with the full limit.',
+)
+MODEL_ROUTES = Counter(
+    'medassist_model_routes_total',
+    'Fast-tier answers by outcome: accepted, or escalated for low_confidence, malformed or error.',
+    labelnames=('outcome',),
+)
+MODEL_RETRIES = Counter(
+    'medassist_model_retries_total', 'Model calls retried after a transient error, by exception class.',
+    labelnames=('error',),
+)
+MODEL_HEDGES = Counter(
+    'medassist_model_hedges_total', 'Hedged model calls by outcome (fired, won by the hedge).',
+    labelnames=('outcome',),
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    'medassist_response_cache_lookups_total', 'Response cache lookups by result (hit, near_hit, miss).',
+    labelnames=('result',),
+)
+MODEL_CONCURRENCY = Gauge(
+    'medassist_model_concurrency', 'Adaptive model call limiter state (limit, inflight, queued), shared per host.',
+    labelnames=('kind',),
+)
+MODEL_KEY_INFLIGHT = Gauge(
+    'medassist_model_key_inflight', 'Model calls in flight per API key (by position in the key pool).',
+    labelnames=('key',),
+)
+MODEL_KEY_THROTTLED = Counter(
+    'medassist_model_key_throttled_total', '429 responses per API key (by position in the key pool).',
+    labelnames=('key',),
+)
+MODEL_SHED_REQUESTS = Counter(
+    'medassist_model_shed_total', 'Requests rejected with 429 because the model call queue was saturated.',
+)
+COALESCED_REQUESTS = Counter(
+    'medassist_coalesced_requests_total', 'Requests answered by waiting on an identical in-flight model call.',
+)
+
+
+def record_model_response(response):
+    """Record usage_metadata and finish_reason from a GenerateContentResponse (or final stream chunk)."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        MODEL_TOKENS.inc(usage.prompt_token_count, kind='prompt')
+        MODEL_TOKENS.inc(usage.candidates_token_count, kind='candidates')
+        MODEL_TOKENS.inc(usage.total_token_count, kind='total')
+        MODEL_OUTPUT_TOKENS.observe(usage.candidates_token_count)
+    candidates = getattr(response, 'candidates', None)
+    if candidates:
+        reason = candidates[0].finish_reason
+        MODEL_FINISH_REASONS.inc(reason=getattr(reason, 'name', reason))
+
+
+def record_model_error(error):
+    MODEL_ERRORS.inc(error=type(error).__name__)
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes under Hamming distance.
+
+    A query only descends into children whose edge distance is within
+    max_distance of the query's distance to the parent (triangle
+    inequality), so most of the tree is skipped for small radii.
+    """
+
+    def __init__(self):
+        self._root = None  # [hash, values, {distance: child}]
+
+    def add(self, key, value):
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+
+    def find(self, key, max_distance):
+        """(distance, value) pairs within max_distance of key, nearest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= max_distance:
+                found.extend((distance, value) for value in node[1])
+            stack.extend(
+                child for edge, child in node[2].items()
+                if distance - max_distance <= edge <= distance + max_distance
+            )
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class NearDuplicateIndex:
+    """Maps perceptual image hashes to earlier results, per lookup context.
+
+    The context is everything besides the image that shapes a result (the
+    description, prompt version, model settings); a match needs the same
+    context and a hash within max_distance bits. Holds at most max_entries
+    hashes, forgetting the least recently added ones first.
+    """
+
+    def __init__(self, max_distance=6, max_entries=10000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (hash, context) -> value, oldest first
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+
+    def add(self, image_hash, context, value):
+        key = (image_hash, context)
+        with self._lock:
+            if key not in self._entries:
+                self._tree.add(image_hash, key)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # BK-trees can't remove nodes: drop the oldest quarter and rebuild from the rest
+        for _ in range(len(self._entries) - self.max_entries * 3 // 4):
+            self._entries.popitem(last=False)
+        self._tree = BKTree()
+        for key in self._entries:
+            self._tree.add(key[0], key)
+
+    def find(self, image_hash, context):
+        """Values stored for context under hashes within max_distance, nearest first."""
+        with self._lock:
+            return [
+                self._entries[key]
+                for _, key in self._tree.find(image_hash, self.max_distance)
+                if key[1] == context
+            ]
+
+    def __len__(self):
+        return len(self._entries)
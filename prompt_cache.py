@@ -0,0 +1,109 @@
+import datetime
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PromptContextCache:
+    """Holds a fixed system prompt in a Gemini CachedContent and keeps it alive.
+
+    The cache is created by a background thread on first use, and the same
+    thread renews its TTL shortly before it expires. Failures are retried
+    after retry_interval, doubling up to max_retry_interval; a 400 (e.g. a
+    prompt below the model's minimum cached-token count) won't change on
+    retry, so it stops the thread for good. While no cache is available,
+    model() returns None and callers send the prompt inline.
+    """
+
+    def __init__(self, load_sdk, model_name, system_instruction, ttl=3600, refresh_margin=300,
+                 retry_interval=60, max_retry_interval=3600, generation_config=None, safety_settings=None):
+        # load_sdk returns the configured google.generativeai module
+        self._load_sdk = load_sdk
+        self.model_name = model_name
+        self.system_instruction = system_instruction
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self._cached = None
+        self._model = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def model(self):
+        with self._lock:
+            if self._thread is None and not self._stopped:
+                self._thread = threading.Thread(
+                    target=self._run, name='prompt-cache-refresher', daemon=True
+                )
+                self._thread.start()
+            return self._model
+
+    def invalidate(self):
+        # Called when a request reports the cached content as missing
+        with self._lock:
+            self._cached = None
+            self._model = None
+        self._wake.set()
+
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+
+    def _create(self):
+        genai = self._load_sdk()
+        cached = genai.caching.CachedContent.create(
+            model=self.model_name,
+            display_name='medassist-system-prompt',
+            system_instruction=self.system_instruction,
+            ttl=datetime.timedelta(seconds=self.ttl),
+        )
+        model = genai.GenerativeModel.from_cached_content(
+            cached,
+            generation_config=self.generation_config,
+            safety_settings=self.safety_settings,
+        )
+        with self._lock:
+            self._cached = cached
+            self._model = model
+
+    def _seconds_until_refresh(self):
+        expire_time = self._cached.expire_time
+        if expire_time.tzinfo is None:
+            expire_time = expire_time.replace(tzinfo=datetime.timezone.utc)
+        remaining = (expire_time - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+        return max(0.0, remaining - self.refresh_margin)
+
+    def _run(self):
+        failures = 0
+        while not self._stopped:
+            try:
+                if self._cached is None:
+                    self._create()
+                    logger.info('Created prompt context cache %s', self._cached.name)
+                else:
+                    self._cached.update(ttl=datetime.timedelta(seconds=self.ttl))
+                wait = self._seconds_until_refresh()
+                failures = 0
+            except Exception as e:
+                with self._lock:
+                    self._cached = None
+                    self._model = None
+                # google.api_core exceptions carry the HTTP status
+                if getattr(e, 'code', None) == 400:
+                    logger.warning('Prompt context cache rejected (%s); sending the prompt inline from now on', e)
+                    self._stopped = True
+                    return
+                failures += 1
+                wait = min(self.retry_interval * 2 ** (failures - 1), self.max_retry_interval)
+                if failures == 1:
+                    logger.exception('Prompt context cache unavailable; falling back to inline prompt')
+                else:
+                    logger.warning('Prompt context cache still unavailable (%s); retrying in %ds', e, wait)
+            self._wake.wait(wait)
+            self._wake.clear()
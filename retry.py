@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# google.api_core exceptions carry the HTTP status in `code`: 429 quota, 503 unavailable,
+# 504 deadline exceeded. Everything else (bad requests, safety blocks, which have no
+# code) fails immediately.
+RETRYABLE_CODES = (429, 503, 504)
+
+
+def is_retryable(error):
+    return getattr(error, 'code', None) in RETRYABLE_CODES
+
+
+class RetryPolicy:
+    """Retries transient failures with full-jitter exponential backoff.
+
+    With hedging enabled, an attempt still running after the hedge_quantile
+    latency of recent successful attempts gets a second, identical call; the
+    first to succeed wins. Hedging starts once min_samples latencies are
+    known and only while can_hedge() allows it.
+
+    Hedged calls run on a pool of max_workers threads; size it to the most
+    calls that can be in flight or queued at once, so no attempt waits for
+    a thread. The hedge delay counts from when an attempt starts running.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, max_delay=8.0, retryable=is_retryable,
+                 hedge=False, hedge_quantile=0.95, min_samples=20, window=200, can_hedge=None,
+                 on_retry=None, on_hedge=None, max_workers=16, sleep=time.sleep, rand=random.random):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = retryable
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.can_hedge = can_hedge or (lambda: True)
+        self.on_retry = on_retry or (lambda error: None)
+        self.on_hedge = on_hedge or (lambda outcome: None)
+        self.max_workers = max_workers
+        self._sleep = sleep
+        self._rand = rand
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def backoff(self, attempt):
+        return self._rand() * min(self.max_delay, self.base_delay * 2 ** attempt)
+
+    def observe(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self):
+        if not self.hedge:
+            return None
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_quantile))]
+
+    def call(self, fn, hedge=True):
+        for attempt in range(self.attempts):
+            try:
+                return self._attempt(fn) if hedge else self._timed(fn)
+            except Exception as e:
+                if attempt + 1 >= self.attempts or not self.retryable(e):
+                    raise
+                self.on_retry(e)
+                self._sleep(self.backoff(attempt))
+
+    async def call_async(self, fn, hedge=True):
+        import asyncio
+
+        for attempt in range(self.attempts):
+            try:
+                return await (self._attempt_async(fn) if hedge else self._timed_async(fn))
+            except Exception as e:
+                if attempt + 1 >= self.attempts or not self.retryable(e):
+                    raise
+                self.on_retry(e)
+                await asyncio.sleep(self.backoff(attempt))
+
+    def _timed(self, fn, running=None):
+        if running is not None:
+            running.set()
+        started = time.monotonic()
+        result = fn()
+        self.observe(time.monotonic() - started)
+        return result
+
+    async def _timed_async(self, fn):
+        started = time.monotonic()
+        result = await fn()
+        self.observe(time.monotonic() - started)
+        return result
+
+    def _attempt(self, fn):
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(fn)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='hedge')
+
+        running = threading.Event()
+        first = self._executor.submit(self._timed, fn, running)
+        # Time spent waiting for a pool thread is not the call being slow
+        running.wait()
+        done, _ = wait([first], timeout=delay)
+        if done or not self.can_hedge():
+            return first.result()
+        self.on_hedge('fired')
+        # The slower call can't be cancelled; it finishes in the background and is ignored
+        second = self._executor.submit(self._timed, fn)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self.on_hedge('won')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _attempt_async(self, fn):
+        import asyncio
+
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed_async(fn)
+
+        first = asyncio.ensure_future(self._timed_async(fn))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or not self.can_hedge():
+            return await first
+        self.on_hedge('fired')
+        second = asyncio.ensure_future(self._timed_async(fn))
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.on_hedge('won')
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,120 @@
+import json
+import re
+
+# Headings INPUT_PROMPT asks the model for, in order
+SECTION_HEADINGS = (
+    'Visual Evidence',
+    'Assessment',
+    'Immediate First Aid',
+    'When to Seek Medical Care',
+    'Trusted India Resources',
+    'Helpline (India)',
+    'Confidence',
+    'Disclaimer',
+)
+
+CONFIDENCE_LEVELS = ('High', 'Medium', 'Low')
+
+# Field names of the structured (JSON) answer, one per section heading
+SECTION_FIELDS = dict(zip(SECTION_HEADINGS, (
+    'visual_evidence',
+    'assessment',
+    'immediate_first_aid',
+    'when_to_seek_care',
+    'trusted_resources',
+    'helpline',
+    'confidence',
+    'disclaimer',
+)))
+_LIST_FIELDS = ('immediate_first_aid', 'trusted_resources')
+
+# Gemini response_schema (OpenAPI subset) for response_mime_type="application/json"
+RESPONSE_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        field: (
+            {'type': 'array', 'items': {'type': 'string'}} if field in _LIST_FIELDS
+            else {'type': 'string', 'format': 'enum', 'enum': list(CONFIDENCE_LEVELS)} if field == 'confidence'
+            else {'type': 'string'}
+        )
+        for field in SECTION_FIELDS.values()
+    },
+    'required': list(SECTION_FIELDS.values()),
+}
+
+# Headings may be wrapped in markdown (**Assessment:**, ## Assessment:) or sit on their own line
+_LEAD = r'^[\s#*>-]*'
+_HEADING_PATTERNS = [
+    re.compile(_LEAD + (r'Helpline(?:\s*\(India\))?' if h == 'Helpline (India)' else re.escape(h)) + r'[\s*]*:',
+               re.I | re.M)
+    for h in SECTION_HEADINGS
+]
+_CONFIDENCE = re.compile(_LEAD + r'Confidence[\s*]*:[\s*]*(high|medium|low)\b', re.I | re.M)
+
+
+def parse_confidence(text):
+    """The level on the Confidence: line ('High', 'Medium' or 'Low'), or None."""
+    match = _CONFIDENCE.search(text or '')
+    return match[1].capitalize() if match else None
+
+
+def escalation_reason(text):
+    """Why a fast-tier answer should be redone by the stronger model, or None to keep it."""
+    if not text or not all(pattern.search(text) for pattern in _HEADING_PATTERNS):
+        return 'malformed'
+    confidence = parse_confidence(text)
+    if confidence is None:
+        return 'malformed'
+    if confidence == 'Low':
+        return 'low_confidence'
+    return None
+
+
+def parse_sections(text):
+    """The typed sections of a structured answer, or None if it doesn't match RESPONSE_SCHEMA."""
+    try:
+        data = json.loads(text or '')
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    sections = {}
+    for field in SECTION_FIELDS.values():
+        value = data.get(field)
+        if field in _LIST_FIELDS:
+            if isinstance(value, str):
+                value = [value]
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return None
+            value = [item.strip() for item in value if item.strip()]
+        elif isinstance(value, str):
+            value = value.strip()
+        else:
+            return None
+        sections[field] = value
+    sections['confidence'] = sections['confidence'].capitalize()
+    if sections['confidence'] not in CONFIDENCE_LEVELS:
+        return None
+    return sections
+
+
+def render_sections(sections):
+    """Structured sections as the heading-per-line text the free-form prompt asks for."""
+    lines = []
+    for heading, field in SECTION_FIELDS.items():
+        value = sections[field]
+        if isinstance(value, list):
+            lines.append(f'{heading}:')
+            lines.extend(f'- {item}' for item in value or ['N/A'])
+        else:
+            lines.append(f'{heading}: {value}')
+    return '\n'.join(lines)
+
+
+def sections_escalation_reason(sections):
+    """escalation_reason for a structured answer (None if it failed to parse)."""
+    if sections is None:
+        return 'malformed'
+    if sections['confidence'] == 'Low':
+        return 'low_confidence'
+    return None
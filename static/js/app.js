@@ -0,0 +1,758 @@
+// Global variables
+const dropZone = document.getElementById('dropZone');
+const imageInput = document.getElementById('imageInput');
+const imagePreview = document.getElementById('imagePreview');
+const imagePreviewContainer = document.getElementById('imagePreviewContainer');
+const fileInfo = document.getElementById('fileInfo');
+const uploadForm = document.getElementById('uploadForm');
+const loadingContainer = document.getElementById('loadingContainer');
+const resultsContainer = document.getElementById('resultsContainer');
+const resultsContent = document.getElementById('resultsContent');
+const analyzeBtn = document.getElementById('analyzeBtn');
+
+// Drag and drop functionality
+['dragenter', 'dragover', 'dragleave', 'drop'].forEach(eventName => {
+    dropZone.addEventListener(eventName, preventDefaults, false);
+    document.body.addEventListener(eventName, preventDefaults, false);
+});
+
+['dragenter', 'dragover'].forEach(eventName => {
+    dropZone.addEventListener(eventName, highlight, false);
+});
+
+['dragleave', 'drop'].forEach(eventName => {
+    dropZone.addEventListener(eventName, unhighlight, false);
+});
+
+function preventDefaults(e) {
+    e.preventDefault();
+    e.stopPropagation();
+}
+
+function highlight(e) {
+    dropZone.classList.add('dragover');
+}
+
+function unhighlight(e) {
+    dropZone.classList.remove('dragover');
+}
+
+dropZone.addEventListener('drop', handleDrop, false);
+dropZone.addEventListener('click', () => imageInput.click());
+dropZone.addEventListener('keydown', (e) => {
+    if (e.key === 'Enter' || e.key === ' ') {
+        e.preventDefault();
+        imageInput.click();
+    }
+});
+
+function handleDrop(e) {
+    const dt = e.dataTransfer;
+    const files = dt.files;
+    if (files.length > 0) {
+        imageInput.files = files;
+        handleFileSelect(files[0]);
+    }
+}
+
+imageInput.addEventListener('change', function(e) {
+    if (e.target.files.length > 0) {
+        handleFileSelect(e.target.files[0]);
+    }
+});
+
+function handleFileSelect(file) {
+    if (file && file.type.startsWith('image/')) {
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            imagePreview.src = e.target.result;
+            imagePreviewContainer.style.display = 'block';
+            fileInfo.innerHTML = `
+                <i class="fas fa-check-circle me-2"></i>
+                <strong>${file.name}</strong> (${formatFileSize(file.size)})
+            `;
+            
+            // Smooth scroll to show the preview
+            setTimeout(() => {
+                imagePreviewContainer.scrollIntoView({ 
+                    behavior: 'smooth', 
+                    block: 'center' 
+                });
+            }, 100);
+        };
+        reader.readAsDataURL(file);
+    } else {
+        showError('Please select a valid image file (PNG, JPG, GIF, etc.)');
+    }
+}
+
+function formatFileSize(bytes) {
+    if (bytes === 0) return '0 Bytes';
+    const k = 1024;
+    const sizes = ['Bytes', 'KB', 'MB', 'GB'];
+    const i = Math.floor(Math.log(bytes) / Math.log(k));
+    return parseFloat((bytes / Math.pow(k, i)).toFixed(1)) + ' ' + sizes[i];
+}
+
+// Escape helper to safely render model text
+function escapeHtml(unsafe) {
+    return String(unsafe)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;');
+}
+
+// Turn plain URLs and markdown links into anchors, leaving existing tags alone
+function linkify(s) {
+    if (!s) return '';
+    // Split by HTML tags so we only operate on text nodes
+    const parts = s.split(/(<[^>]+>)/g);
+    const mdLink = /\[([^\]]+)\]\((https?:\/\/[^\s)]+)\)/g;
+    const plainUrl = /(^|[^\w"'/>])((https?:\/\/[^\s)]+))/g; // not preceded by word char or quotes/angle
+    const out = parts.map((chunk, idx) => {
+        if (idx % 2 === 1) return chunk; // keep tags as-is
+        let t = chunk;
+        // Convert markdown links first
+        t = t.replace(mdLink, '<a href="$2" target="_blank" class="resource-link">$1</a>');
+        // Convert remaining plain URLs (ensure we keep preceding separator)
+        t = t.replace(plainUrl, (m, p1, p2) => `${p1}<a href="${p2}" target="_blank" class="resource-link">${p2}</a>`);
+        return t;
+    }).join('');
+    return out;
+}
+
+// Format the AI response with proper styling (robust to markdown-like output)
+function formatAIResponse(response) {
+    if (!response) return '<div class="ai-analysis"><div class="analysis-section"><p class="section-content">No response.</p></div></div>';
+
+    const text = String(response).replace(/\r/g, '').trim();
+    const lines = text.split('\n');
+
+    // Helpers
+    const headingRegex = /^(\**\s*)?(visual evidence|assessment|immediate first aid|when to seek medical care|trusted india resources|helpline\s*\(india\)|helpline|confidence|disclaimer|seek medical attention(?:\s*if)?)\s*:?(\s*\**)?$/i;
+    const cleanLine = (s) => {
+        if (!s) return '';
+        let out = s.trim();
+        // Strip markdown list markers and bold/italics
+        out = out.replace(/^[-*•]\s+/g, '');
+        out = out.replace(/^\d+\.[\)\s]+/, '');
+        out = out.replace(/^\*{1,3}\s*/, '');
+        out = out.replace(/\*{2,3}$/,'');
+        // Remove remaining surrounding ** **
+        out = out.replace(/^\*{2,}\s*/, '').replace(/\s*\*{2,}$/, '');
+        return out.trim();
+    };
+    // Map of canonical headings -> array of content lines
+    const sections = {
+        'Visual Evidence': [],
+        'Assessment': [],
+        'Immediate First Aid': [],
+        'When to Seek Medical Care': [],
+        'Trusted India Resources': [],
+        'Helpline (India)': [],
+        'Confidence': [],
+        'Disclaimer': []
+    };
+
+    const normalizeHeading = (h) => {
+        const key = h.toLowerCase();
+        if (key.includes('visual')) return 'Visual Evidence';
+        if (key.includes('assessment')) return 'Assessment';
+        if (key.includes('immediate')) return 'Immediate First Aid';
+        if (key.includes('seek medical') || key.includes('medical attention')) return 'When to Seek Medical Care';
+        if (key.includes('trusted') || key.includes('resources')) return 'Trusted India Resources';
+        if (key.startsWith('helpline')) return 'Helpline (India)';
+        if (key.includes('confidence')) return 'Confidence';
+        if (key.includes('disclaimer')) return 'Disclaimer';
+        return null;
+    };
+
+    let current = null;
+    for (let raw of lines) {
+        const line = raw.trim();
+        if (!line) continue;
+
+        const m = line.match(headingRegex);
+        if (m) {
+            const canonical = normalizeHeading(m[2] || '');
+            if (canonical) {
+                current = canonical;
+                continue;
+            }
+        }
+
+        // If the model put heading and content on same line like "Visual Evidence: ..."
+        const idx = line.indexOf(':');
+        if (idx > 0) {
+            const maybeHead = line.slice(0, idx).replace(/\*/g, '').trim();
+            const canonical = normalizeHeading(maybeHead);
+            if (canonical) {
+                current = canonical;
+                const rest = cleanLine(line.slice(idx + 1));
+                if (rest) sections[current].push(rest);
+                continue;
+            }
+        }
+
+        // Otherwise treat as content for current section
+        if (!current) {
+            // If no heading yet, skip or append to Visual Evidence by default
+            current = 'Visual Evidence';
+        }
+        sections[current].push(cleanLine(line));
+    }
+
+    return renderSections(sections);
+}
+
+// Render the typed sections /analyze returns in structured mode; no text parsing needed
+function formatStructuredResponse(fields) {
+    const lines = (value) => (Array.isArray(value) ? value : [value]).filter(Boolean);
+    return renderSections({
+        'Visual Evidence': lines(fields.visual_evidence),
+        'Assessment': lines(fields.assessment),
+        'Immediate First Aid': lines(fields.immediate_first_aid),
+        'When to Seek Medical Care': lines(fields.when_to_seek_care),
+        'Trusted India Resources': lines(fields.trusted_resources),
+        'Helpline (India)': lines(fields.helpline),
+        'Confidence': lines(fields.confidence),
+        'Disclaimer': lines(fields.disclaimer)
+    });
+}
+
+// Render canonical headings -> arrays of content lines
+function renderSections(sections) {
+    const renderParagraphOrList = (arr) => {
+        // Detect if multiple bullet-like lines exist
+        const items = arr.filter(Boolean);
+        if (!items.length) return '<p class="section-content text-muted">N/A</p>';
+
+        const bulletish = items.some(l => /^[-*•]|^\d+\./.test(l));
+        if (bulletish || items.length > 1) {
+            const li = items.map(v => `<li>${linkify(v.replace(/^[-*•]\s+|^\d+\.[\)\s]+/, ''))}</li>`).join('');
+            return `<ul class="section-content">${li}</ul>`;
+        }
+        return `<p class="section-content">${linkify(items.join(' '))}</p>`;
+    };
+
+    let html = '<div class="ai-analysis">';
+
+    html += `
+        <div class="analysis-section">
+            <h5 class="section-title"><i class="fas fa-eye me-2"></i>Visual Evidence</h5>
+            ${renderParagraphOrList(sections['Visual Evidence'])}
+        </div>`;
+
+    html += `
+        <div class="analysis-section">
+            <h5 class="section-title"><i class="fas fa-stethoscope me-2"></i>Assessment</h5>
+            ${renderParagraphOrList(sections['Assessment'])}
+        </div>`;
+
+    const firstAid = sections['Immediate First Aid'];
+    html += `
+        <div class="analysis-section">
+            <h5 class="section-title"><i class="fas fa-hand-holding-medical me-2"></i>Immediate First Aid</h5>
+            ${firstAid.length && firstAid.join('').toUpperCase() !== 'N/A' ? renderParagraphOrList(firstAid) : '<p class="section-content text-muted">No immediate first aid required</p>'}
+        </div>`;
+
+    const care = sections['When to Seek Medical Care'];
+    html += `
+        <div class="analysis-section">
+            <h5 class="section-title"><i class="fas fa-exclamation-triangle me-2"></i>When to Seek Medical Care</h5>
+            ${care.length && care.join('').toUpperCase() !== 'N/A' ? renderParagraphOrList(care) : '<p class="section-content text-muted">N/A</p>'}
+        </div>`;
+
+    // Resources
+    const resourcesRaw = sections['Trusted India Resources'];
+    const resHtml = resourcesRaw.length ? formatResources(resourcesRaw.join('\n')) : 'N/A';
+    html += `
+        <div class="analysis-section">
+            <h5 class="section-title"><i class="fas fa-hospital me-2"></i>Trusted India Resources</h5>
+            ${resHtml}
+        </div>`;
+
+    // Helpline
+    const help = sections['Helpline (India)'];
+    const helpText = help.join(' ') || 'Emergency number 108';
+    html += `
+        <div class="analysis-section emergency-section">
+            <h5 class="section-title"><i class="fas fa-phone me-2"></i>Emergency Helpline (India)</h5>
+            <div class="section-content"><a href="tel:108" class="emergency-number-display">${helpText}</a></div>
+        </div>`;
+
+    // Disclaimer
+    const disc = sections['Disclaimer'];
+    html += `
+        <div class="analysis-section disclaimer-section">
+            <h5 class="section-title"><i class="fas fa-shield-alt me-2"></i>Disclaimer</h5>
+            ${renderParagraphOrList(disc.length ? disc : ['This is first-aid guidance only, not medical diagnosis.'])}
+        </div>`;
+
+    html += '</div>';
+    return html;
+}
+
+// Format resources with proper links, deduped and pill-styled
+function formatResources(resourcesText) {
+    if (!resourcesText) return '<p class="section-content text-muted">N/A</p>';
+    const urls = new Set();
+
+    const addUrl = (u) => {
+        if (!u) return;
+        // strip trailing punctuation
+        let cleaned = u.trim().replace(/[)>,.;]+$/g, '');
+        // ensure scheme
+        if (!/^https?:\/\//i.test(cleaned)) cleaned = 'https://' + cleaned;
+        urls.add(cleaned);
+    };
+
+    // Collect from markdown links [text](url)
+    for (const m of resourcesText.matchAll(/\((https?:\/\/[^\s)]+)\)/g)) addUrl(m[1]);
+    // Collect from plain text URLs
+    for (const m of resourcesText.matchAll(/https?:\/\/[^\s)]+/g)) addUrl(m[0]);
+
+    let list = [...urls];
+
+    // Fallback defaults if model didn't provide any
+    if (!list.length) {
+        list = [
+            'https://www.mohfw.gov.in/',
+            'https://www.nhp.gov.in/',
+            'https://esanjeevani.in/'
+        ];
+    }
+
+    // Map URLs to company names
+    const getCompanyName = (url) => {
+        const domain = url.replace(/^https?:\/\//, '').replace(/^www\./, '').split('/')[0];
+        if (domain.includes('apollo')) return 'Apollo Hospitals';
+        if (domain.includes('maxhealth')) return 'Max Healthcare';
+        if (domain.includes('fortis')) return 'Fortis Healthcare';
+        if (domain.includes('mohfw')) return 'Ministry of Health & Family Welfare';
+        if (domain.includes('nhp')) return 'National Health Portal';
+        if (domain.includes('esanjeevani')) return 'eSanjeevani Telemedicine';
+        if (domain.includes('fortishealthcare')) return 'Fortis Healthcare';
+        // Extract company name from domain
+        return domain.split('.')[0].replace(/([A-Z])/g, ' $1').replace(/^./, str => str.toUpperCase());
+    };
+
+    const items = list.map(url => {
+        const companyName = getCompanyName(url);
+        return `<li><a href="${url}" target="_blank" class="resource-link"><strong>${companyName}</strong><br><small>${url}</small></a></li>`;
+    }).join('');
+    
+    return `<ul class="section-content">${items}</ul>`;
+}
+
+// Get confidence badge styling
+function getConfidenceClass(confidence) {
+    if (confidence.toLowerCase().includes('high')) return 'confidence-high';
+    if (confidence.toLowerCase().includes('medium')) return 'confidence-medium';
+    return 'confidence-low';
+}
+
+// Form submission
+uploadForm.addEventListener('submit', async function(e) {
+    e.preventDefault();
+    
+    if (!imageInput.files.length) {
+        showError('Please select an image first');
+        return;
+    }
+
+    // Show loading state
+    loadingContainer.style.display = 'block';
+    resultsContainer.style.display = 'none';
+    analyzeBtn.disabled = true;
+    
+    // Scroll to loading section
+    loadingContainer.scrollIntoView({ behavior: 'smooth' });
+
+    const formData = new FormData();
+    formData.append('image', imageInput.files[0]);
+    formData.append('description', document.getElementById('description').value || '');
+
+    // In structured mode the server returns parsed sections in one response instead of streaming text
+    const structured = document.body.dataset.analyzeMode === 'structured';
+
+    try {
+        const resp = await fetch(structured ? '/analyze' : '/analyze/stream', {
+            method: 'POST',
+            body: formData
+        });
+        if (!resp.ok) {
+            const data = await resp.json();
+            throw new Error(data.error || 'Analysis failed');
+        }
+        if (structured) {
+            const data = await resp.json();
+            loadingContainer.style.display = 'none';
+            displayResults(data.sections ? formatStructuredResponse(data.sections) : formatAIResponse(data.response));
+        } else {
+            await renderAnalysisStream(resp);
+        }
+    } catch (error) {
+        const friendly = (error && error.message) ? error.message : 'An error occurred while analyzing the image. Please try again.';
+        showError(friendly);
+        console.error('Analysis error:', error);
+    } finally {
+        loadingContainer.style.display = 'none';
+        analyzeBtn.disabled = false;
+    }
+});
+
+// Render Server-Sent Events from /analyze/stream as they arrive
+async function renderAnalysisStream(resp) {
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    let shown = false;
+
+    const handleEvent = (rawEvent) => {
+        let event = 'message';
+        let data = '';
+        rawEvent.split('\n').forEach(line => {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) data += line.slice(5).trim();
+        });
+        if (!data) return;
+        const payload = JSON.parse(data);
+        if (event === 'error') {
+            throw new Error(payload.error || 'Analysis failed');
+        }
+        if (event === 'escalate') {
+            // The analysis is being redone (stronger model, or a longer answer); its text replaces what was shown
+            text = '';
+            if (shown) {
+                const note = payload.reason === 'truncated'
+                    ? 'Finishing the full analysis...'
+                    : 'Double-checking with a more thorough analysis...';
+                resultsContent.innerHTML = `<p class="text-muted">${note}</p>`;
+            }
+            return;
+        }
+        if (event === 'chunk') {
+            text += payload.text || '';
+            if (!shown) {
+                loadingContainer.style.display = 'none';
+                displayResults(formatAIResponse(text));
+                shown = true;
+            } else {
+                resultsContent.innerHTML = formatAIResponse(text);
+            }
+        }
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true }).replace(/\r/g, '');
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            handleEvent(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+        }
+    }
+    if (buffer.trim()) handleEvent(buffer);
+    if (!shown) {
+        displayResults(formatAIResponse(''));
+    }
+}
+
+async function simulateAnalysis() {
+    // Simulate processing time
+    return new Promise(resolve => setTimeout(resolve, 3000));
+}
+
+function generateMockResponse() {
+    return `
+<div class="alert alert-info mb-4">
+    <h6><i class="fas fa-info-circle me-2"></i>AI Analysis Complete</h6>
+    <p class="mb-0">Based on the uploaded image, here's our preliminary assessment and recommendations:</p>
+</div>
+
+<h5><i class="fas fa-diagnoses me-2"></i>Initial Assessment</h5>
+<p>The image appears to show a minor surface wound that requires basic first aid care. This assessment is based on visual analysis and should not replace professional medical evaluation.</p>
+
+<h5><i class="fas fa-hand-holding-medical me-2"></i>Immediate First Aid Steps</h5>
+<div class="resource-grid">
+    <div class="resource-card">
+<h6>1. Clean Your Hands</h6>
+<p>Wash hands thoroughly with soap and water for at least 20 seconds before treating the wound.</p>
+    </div>
+    <div class="resource-card">
+<h6>2. Stop Bleeding</h6>
+<p>Apply gentle, direct pressure with a clean cloth or sterile gauze until bleeding stops.</p>
+    </div>
+    <div class="resource-card">
+<h6>3. Clean the Wound</h6>
+<p>Rinse with clean water. Avoid hydrogen peroxide or alcohol on open wounds.</p>
+    </div>
+    <div class="resource-card">
+<h6>4. Apply Antibiotic</h6>
+<p>Use a thin layer of antibiotic ointment if available and no allergies are present.</p>
+    </div>
+    <div class="resource-card">
+<h6>5. Cover & Protect</h6>
+<p>Cover with a sterile bandage and change daily or when wet/dirty.</p>
+    </div>
+    <div class="resource-card">
+<h6>6. Monitor for Infection</h6>
+<p>Watch for increased pain, redness, swelling, warmth, or pus.</p>
+    </div>
+</div>
+
+<h5><i class="fas fa-exclamation-triangle me-2 text-warning"></i>When to Seek Medical Care</h5>
+<ul class="list-group list-group-flush mb-4">
+    <li class="list-group-item px-0 border-0">
+<i class="fas fa-chevron-right me-2 text-danger"></i>
+<strong>Immediate care needed:</strong> Deep wounds, uncontrolled bleeding, signs of infection
+    </li>
+    <li class="list-group-item px-0 border-0">
+<i class="fas fa-chevron-right me-2 text-warning"></i>
+<strong>Within 24 hours:</strong> Wounds from dirty/rusty objects, animal bites, or if tetanus shot is overdue
+    </li>
+    <li class="list-group-item px-0 border-0">
+<i class="fas fa-chevron-right me-2 text-info"></i>
+<strong>Follow-up care:</strong> If wound doesn't heal properly or shows signs of infection
+    </li>
+</ul>
+
+<h5><i class="fas fa-hospital me-2"></i>Trusted Healthcare Resources</h5>
+<div class="row g-3 mb-4">
+    <div class="col-md-6">
+<div class="resource-card">
+    <h6><i class="fas fa-globe me-2"></i>Government Resources</h6>
+    <ul class="list-unstyled mb-0">
+        <li><a href="https://www.mohfw.gov.in" target="_blank">Ministry of Health & Family Welfare</a></li>
+        <li><a href="https://www.nhp.gov.in" target="_blank">National Health Portal</a></li>
+        <li><a href="https://esanjeevani.in" target="_blank">eSanjeevani Telemedicine</a></li>
+    </ul>
+</div>
+    </div>
+    <div class="col-md-6">
+<div class="resource-card">
+    <h6><i class="fas fa-phone me-2"></i>Emergency Contacts</h6>
+    <ul class="list-unstyled mb-0">
+        <li><strong>112</strong> - National Emergency</li>
+        <li><strong>108</strong> - Ambulance Service</li>
+        <li><strong>102</strong> - Medical Emergency</li>
+    </ul>
+</div>
+    </div>
+</div>
+
+<div class="alert alert-warning">
+    <h6><i class="fas fa-shield-alt me-2"></i>Important Disclaimer</h6>
+    <p class="mb-0">This AI analysis is for informational purposes only and should not replace professional medical advice, diagnosis, or treatment. Always consult with qualified healthcare professionals for serious injuries or medical concerns.</p>
+</div>
+    `;
+}
+
+function displayResults(htmlContent) {
+    resultsContent.innerHTML = htmlContent;
+    resultsContainer.style.display = 'block';
+    
+    // Animate the results appearance
+    resultsContainer.style.opacity = '0';
+    resultsContainer.style.transform = 'translateY(20px)';
+    
+    setTimeout(() => {
+        resultsContainer.style.transition = 'all 0.5s ease';
+        resultsContainer.style.opacity = '1';
+        resultsContainer.style.transform = 'translateY(0)';
+        
+        // Scroll to results
+        resultsContainer.scrollIntoView({ 
+            behavior: 'smooth', 
+            block: 'start' 
+        });
+    }, 100);
+}
+
+function showError(message) {
+    const errorAlert = document.createElement('div');
+    errorAlert.className = 'alert alert-danger alert-dismissible fade show';
+    errorAlert.innerHTML = `
+        <i class="fas fa-exclamation-triangle me-2"></i>
+        <strong>Error:</strong> ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
+    `;
+    
+    // Insert error at the top of the main card
+    const mainCard = document.querySelector('.main-card');
+    mainCard.insertBefore(errorAlert, mainCard.firstChild);
+    
+    // Auto-remove after 5 seconds
+    setTimeout(() => {
+        if (errorAlert.parentNode) {
+            errorAlert.remove();
+        }
+    }, 5000);
+    
+    // Scroll to show error
+    errorAlert.scrollIntoView({ behavior: 'smooth' });
+}
+
+// Enhanced accessibility
+document.addEventListener('keydown', function(e) {
+    // Allow Enter key to trigger file selection when drop zone is focused
+    if (e.target === dropZone && (e.key === 'Enter' || e.key === ' ')) {
+        e.preventDefault();
+        imageInput.click();
+    }
+});
+
+// Service Worker for offline functionality (optional)
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', function() {
+        navigator.serviceWorker.register('/sw.js').then(function(registration) {
+            console.log('ServiceWorker registration successful');
+        }, function(err) {
+            console.log('ServiceWorker registration failed: ', err);
+        });
+    });
+}
+
+// Progressive Web App features
+let deferredPrompt;
+window.addEventListener('beforeinstallprompt', (e) => {
+    e.preventDefault();
+    deferredPrompt = e;
+    
+    // Show install button if desired
+    const installBtn = document.createElement('button');
+    installBtn.className = 'btn btn-outline-primary btn-sm position-fixed bottom-0 end-0 m-3';
+    installBtn.innerHTML = '<i class="fas fa-download me-2"></i>Install App';
+    installBtn.onclick = async () => {
+        if (deferredPrompt) {
+            deferredPrompt.prompt();
+            const { outcome } = await deferredPrompt.userChoice;
+            console.log(`User response to the install prompt: ${outcome}`);
+            deferredPrompt = null;
+            installBtn.remove();
+        }
+    };
+    document.body.appendChild(installBtn);
+});
+
+// Touch gestures for mobile
+let touchStartY = 0;
+let touchEndY = 0;
+
+document.addEventListener('touchstart', e => {
+    touchStartY = e.changedTouches[0].screenY;
+});
+
+document.addEventListener('touchend', e => {
+    touchEndY = e.changedTouches[0].screenY;
+    handleGesture();
+});
+
+function handleGesture() {
+    const swipeThreshold = 50;
+    const diff = touchStartY - touchEndY;
+    
+    if (Math.abs(diff) > swipeThreshold) {
+        if (diff > 0) {
+            // Swipe up - could trigger some action
+            console.log('Swipe up detected');
+        } else {
+            // Swipe down - could trigger refresh or other action
+            console.log('Swipe down detected');
+        }
+    }
+}
+
+// Performance monitoring
+window.addEventListener('load', function() {
+    const loadTime = performance.timing.loadEventEnd - performance.timing.navigationStart;
+    console.log(`Page load time: ${loadTime}ms`);
+    
+    // Report to analytics if needed
+    if (loadTime > 3000) {
+        console.warn('Page load time is slow');
+    }
+});
+
+// Image optimization helper
+function optimizeImage(file, maxWidth = 800, quality = 0.8) {
+    return new Promise((resolve) => {
+        const canvas = document.createElement('canvas');
+        const ctx = canvas.getContext('2d');
+        const img = new Image();
+        
+        img.onload = function() {
+            const ratio = Math.min(maxWidth / img.width, maxWidth / img.height);
+            canvas.width = img.width * ratio;
+            canvas.height = img.height * ratio;
+            
+            ctx.drawImage(img, 0, 0, canvas.width, canvas.height);
+            canvas.toBlob(resolve, 'image/jpeg', quality);
+        };
+        
+        img.src = URL.createObjectURL(file);
+    });
+}
+
+// Enhanced file handling with validation
+async function validateAndProcessFile(file) {
+    const maxSize = 10 * 1024 * 1024; // 10MB
+    const allowedTypes = ['image/jpeg', 'image/png', 'image/gif', 'image/webp'];
+    
+    if (!allowedTypes.includes(file.type)) {
+        throw new Error('Please select a valid image file (JPEG, PNG, GIF, or WebP)');
+    }
+    
+    if (file.size > maxSize) {
+        throw new Error('File size too large. Please select an image under 10MB');
+    }
+    
+    // Optimize large images
+    if (file.size > 2 * 1024 * 1024) { // 2MB
+        return await optimizeImage(file);
+    }
+    
+    return file;
+}
+
+// Update the file selection handler
+async function handleFileSelectEnhanced(file) {
+    try {
+        const processedFile = await validateAndProcessFile(file);
+        
+        const reader = new FileReader();
+        reader.onload = function(e) {
+            imagePreview.src = e.target.result;
+            imagePreviewContainer.style.display = 'block';
+            fileInfo.innerHTML = `
+                <i class="fas fa-check-circle me-2 text-success"></i>
+                <strong>${file.name}</strong> (${formatFileSize(file.size)})
+                ${file !== processedFile ? '<span class="badge bg-info ms-2">Optimized</span>' : ''}
+            `;
+            
+            setTimeout(() => {
+                imagePreviewContainer.scrollIntoView({ 
+                    behavior: 'smooth', 
+                    block: 'center' 
+                });
+            }, 100);
+        };
+        reader.readAsDataURL(processedFile);
+        
+        // Update the file input with processed file
+        const dt = new DataTransfer();
+        dt.items.add(processedFile);
+        imageInput.files = dt.files;
+        
+    } catch (error) {
+        showError(error.message);
+    }
+}
+
+// Replace the original handleFileSelect with enhanced version
+function handleFileSelect(file) {
+    handleFileSelectEnhanced(file);
+}
@@ -0,0 +1,283 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import NamedTuple
+
+from werkzeug.utils import secure_filename
+
+# Read uploads in fixed-size chunks so hashing happens in the same pass
+CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+# Names produced by persist_upload; anything else in the folder is left alone
+_STORED_NAME = re.compile(r'^[0-9a-f]{64}(\.thumb)?(\.[a-z0-9]+)?$')
+_TEMP_PREFIX = '.upload-'
+
+# Leading bytes of the image formats Gemini accepts
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+
+
+class UploadBlob(NamedTuple):
+    data: bytes
+    digest: str
+    mime_type: str
+    ext: str
+
+    @property
+    def filename(self):
+        return self.digest + self.ext
+
+    def derivative(self, data, mime_type, kind):
+        """A file derived from this upload, stored as <digest>.<kind><ext>."""
+        return UploadBlob(data, self.digest, mime_type, f'.{kind}' + (mimetypes.guess_extension(mime_type) or ''))
+
+
+class StoredUpload(NamedTuple):
+    digest: str
+    filename: str
+    path: str
+    size: int
+    created: bool
+
+
+def upload_extension(filename):
+    return os.path.splitext(secure_filename(filename or ''))[1].lower()
+
+
+def sniff_image_mime(data):
+    for signature, mime_type in _IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def read_upload(file, chunk_size=CHUNK_SIZE):
+    """Read an upload into memory, hashing it with SHA-256 as it streams in.
+
+    The MIME type comes from the content itself, falling back to the
+    client filename; it is None when neither looks like an image.
+    """
+    hasher = hashlib.sha256()
+    chunks = []
+    while chunk := file.stream.read(chunk_size):
+        hasher.update(chunk)
+        chunks.append(chunk)
+    data = b''.join(chunks)
+
+    mime_type = sniff_image_mime(data)
+    if mime_type is None:
+        guessed, _ = mimetypes.guess_type(file.filename or '')
+        if guessed and guessed.startswith('image/'):
+            mime_type = guessed
+    # Name the stored file after what the bytes are, not what the client called them
+    ext = (mimetypes.guess_extension(mime_type) if mime_type else None) or upload_extension(file.filename)
+    return UploadBlob(data, hasher.hexdigest(), mime_type, ext)
+
+
+def persist_upload(blob, folder):
+    """Write an upload under its digest so duplicates are only stored once.
+
+    The temp-file-and-rename dance keeps concurrent writers from exposing a
+    partially written file.
+    """
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, blob.filename)
+    try:
+        # Reusing a stored copy bumps its mtime, which other workers' retention sweeps read as a use
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    else:
+        return StoredUpload(blob.digest, blob.filename, path, len(blob.data), False)
+
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=_TEMP_PREFIX, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(blob.data)
+        # Atomic rename; a racing writer of the same digest writes the same bytes
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return StoredUpload(blob.digest, blob.filename, path, len(blob.data), True)
+
+
+class UploadRetention:
+    """Keeps the upload folder within a size and age budget.
+
+    Requests only record activity (touch / mark_failed), which is O(1). A
+    daemon thread sweeps periodically: it re-reads the folder, deletes files
+    unused for longer than max_age, then least-recently-used files until the
+    folder fits in max_bytes. Only digest-named uploads and stale temp files
+    are removed.
+
+    Workers share the folder, so a file's mtime doubles as its last use:
+    each sweep adopts newer mtimes and writes back newer local uses.
+    """
+
+    def __init__(self, folder, max_bytes=256 * 1024 * 1024, max_age=24 * 3600,
+                 sweep_interval=60, background=True, clock=time.time):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        # background=False leaves sweeping to the caller
+        self.background = background
+        self._clock = clock
+        self._files = {}  # filename -> [size, last_used, uses]
+        self._failed = {}  # filename -> last_used when its only use failed
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def total_bytes(self):
+        return self._bytes
+
+    def touch(self, filename, size=None):
+        self._ensure_started()
+        with self._lock:
+            entry = self._files.get(filename)
+            if entry is None:
+                if size is None:
+                    return
+                self._files[filename] = [size, self._clock(), 1]
+                self._bytes += size
+            else:
+                entry[1] = self._clock()
+                entry[2] += 1
+            self._failed.pop(filename, None)
+
+    def mark_failed(self, filename):
+        """Take back the use recorded for a failed request.
+
+        The file is removed at the next sweep if nothing else used it,
+        here or (judging by its mtime) in another worker, since.
+        """
+        with self._lock:
+            if (entry := self._files.get(filename)) is not None:
+                entry[2] -= 1
+                if entry[2] <= 0:
+                    self._failed[filename] = entry[1]
+
+    def sweep(self):
+        on_disk = self._list_stored()
+        with self._lock:
+            stamps = self._reconcile(on_disk)
+            now = self._clock()
+            # A failed request's file goes unless something used it after the failure
+            victims = [name for name, stamp in self._failed.items()
+                       if name in self._files and self._files[name][1] <= stamp]
+            self._failed.clear()
+            victims += [name for name, (_, used, _) in self._files.items()
+                        if now - used > self.max_age and name not in victims]
+            for name in victims:
+                self._forget(name)
+            if self._bytes > self.max_bytes:
+                for name, _ in sorted(self._files.items(), key=lambda item: item[1][1]):
+                    if self._bytes <= self.max_bytes:
+                        break
+                    victims.append(name)
+                    self._forget(name)
+
+        for name, used in stamps:
+            try:
+                os.utime(os.path.join(self.folder, name), (used, used))
+            except FileNotFoundError:
+                pass
+        removed = 0
+        for name in victims:
+            try:
+                os.unlink(os.path.join(self.folder, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        removed += self._remove_stale_temp_files(now)
+        return removed
+
+    def _forget(self, name):
+        size, _, _ = self._files.pop(name)
+        self._bytes -= size
+
+    def _list_stored(self):
+        # Stat outside the lock so requests aren't held up by a large folder
+        try:
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            return {}
+        stored = {}
+        for entry in entries:
+            if _STORED_NAME.match(entry.name):
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        stored[entry.name] = (stat.st_size, stat.st_mtime)
+                except FileNotFoundError:
+                    pass
+        return stored
+
+    def _reconcile(self, on_disk):
+        """Match the tracked files to the folder; returns (name, last_used) mtimes to write back."""
+        for name in [name for name in self._files if name not in on_disk]:
+            # Removed by another worker
+            self._forget(name)
+        stamps = []
+        for name, (size, mtime) in on_disk.items():
+            entry = self._files.get(name)
+            if entry is None:
+                # Written by another worker or an earlier process: its age starts from mtime, and
+                # its writer counts as a use, so a failure here alone doesn't remove it
+                self._files[name] = [size, mtime, 1]
+                self._bytes += size
+            elif mtime > entry[1]:
+                entry[1] = mtime
+            elif entry[1] > mtime:
+                stamps.append((name, entry[1]))
+        return stamps
+
+    def _remove_stale_temp_files(self, now):
+        removed = 0
+        try:
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            # A temp file this old belongs to a writer that died mid-upload
+            if entry.name.startswith(_TEMP_PREFIX) and now - entry.stat().st_mtime > self.sweep_interval * 10:
+                try:
+                    os.unlink(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def _ensure_started(self):
+        if self._thread is not None or not self.background:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='upload-retention', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                if removed := self.sweep():
+                    logger.info('Upload retention removed %d file(s)', removed)
+            except Exception:
+                logger.exception('Upload retention sweep failed')
+            time.sleep(self.sweep_interval)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+from check_import_budget import probe
+
+BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '400'))
+
+
+def test_web_only_path_cold_starts_within_budget():
+    # Fastest of three fresh interpreters, as the script does, so one slow run doesn't fail it
+    runs = [probe() for _ in range(3)]
+    assert min(run['total_ms'] for run in runs) <= BUDGET_MS
+    assert all(run['statuses'] == [200, 200] for run in runs)
+
+
+def test_web_only_path_skips_heavy_modules():
+    assert probe()['heavy'] == []
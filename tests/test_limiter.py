@@ -0,0 +1,139 @@
+import asyncio
+import heapq
+import random
+import statistics
+
+import pytest
+
+from limiter import AdaptiveLimiter, Overloaded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Throttled(Exception):
+    pass
+
+
+def make_limiter(clock, **kwargs):
+    kwargs.setdefault('initial_limit', 8)
+    kwargs.setdefault('max_limit', 64)
+    kwargs.setdefault('max_queue', 10 ** 6)
+    kwargs.setdefault('queue_deadline', 1e9)
+    return AdaptiveLimiter(clock=clock, is_overload=lambda e: isinstance(e, Throttled), **kwargs)
+
+
+def run_saturated(limiter, clock, latency, calls):
+    """Keep every slot busy for `calls` calls; latency(n) gives each call's duration."""
+    pending = []
+    started = 0
+    limits = []
+
+    def fill():
+        nonlocal started
+        while started < calls and limiter.has_capacity():
+            heapq.heappush(pending, (clock.now + latency(started), started, limiter.acquire()))
+            started += 1
+
+    fill()
+    while pending:
+        clock.now, _, slot = heapq.heappop(pending)
+        slot.release()
+        limits.append(limiter.snapshot()['limit'])
+        fill()
+    return limits
+
+
+@pytest.mark.parametrize('sigma', [0.35, 0.5, 1.0])
+def test_latency_variance_alone_does_not_shrink_the_limit(sigma):
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    rng = random.Random(1)
+    limits = run_saturated(limiter, clock, lambda n: rng.lognormvariate(0, sigma), 20000)
+    assert min(limits) >= 8
+    assert statistics.median(limits[len(limits) // 2:]) == 64
+
+
+def test_odd_first_call_does_not_skew_the_baseline():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    rng = random.Random(2)
+    limits = run_saturated(limiter, clock, lambda n: 0.01 if n == 0 else rng.lognormvariate(0, 0.5), 5000)
+    assert min(limits) >= 8
+
+
+def test_sustained_latency_rise_shrinks_the_limit():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    limits = run_saturated(limiter, clock, lambda n: 1.0 if n < 2000 else 5.0, 2300)
+    assert limits[-1] < max(limits)
+
+
+def test_overload_shrinks_once_per_latency_window():
+    clock = FakeClock()
+    limiter = make_limiter(clock, initial_limit=10, backoff=0.5)
+    for _ in range(60):
+        with limiter.acquire():
+            clock.now += 1.0
+    slots = [limiter.acquire() for _ in range(5)]
+    for slot in slots:
+        slot.release(Throttled())
+    assert limiter.snapshot()['limit'] == pytest.approx(5.0)
+    clock.now += 1.5
+    limiter.acquire().release(Throttled())
+    assert limiter.snapshot()['limit'] == pytest.approx(2.5)
+
+
+def test_unsampled_release_leaves_latency_alone():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+    slot = limiter.acquire()
+    clock.now += 30.0
+    slot.release(sample=False)
+    assert limiter.snapshot()['avg_latency'] == 0.0
+    assert limiter.snapshot()['inflight'] == 0
+
+
+def test_full_queue_is_shed():
+    clock = FakeClock()
+    limiter = make_limiter(clock, initial_limit=1, max_limit=1, max_queue=0)
+    with limiter.acquire():
+        with pytest.raises(Overloaded):
+            limiter.acquire()
+    assert limiter.snapshot()['queued'] == 0
+
+
+@pytest.mark.parametrize('shared', [False, True])
+def test_cancelled_async_waiter_leaves_the_queue(tmp_path, shared):
+    state_path = str(tmp_path / 'limiter-state') if shared else None
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, queue_deadline=60, state_path=state_path)
+
+    async def scenario():
+        slot = await limiter.acquire_async()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0.05)
+        assert limiter.snapshot()['queued'] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        async with slot:
+            pass
+
+    asyncio.run(scenario())
+    assert limiter.snapshot()['queued'] == 0
+    assert limiter.snapshot()['inflight'] == 0
+
+
+def test_shared_state_round_trips(tmp_path):
+    path = str(tmp_path / 'limiter-state')
+    first = AdaptiveLimiter(initial_limit=4, state_path=path)
+    second = AdaptiveLimiter(initial_limit=4, state_path=path)
+    slot = first.acquire()
+    assert second.snapshot()['inflight'] == 1
+    slot.release()
+    assert second.snapshot()['inflight'] == 0
@@ -0,0 +1,41 @@
+import threading
+import time
+
+from retry import RetryPolicy
+
+
+def test_waiting_for_a_pool_thread_does_not_fire_hedges():
+    hedges = []
+    policy = RetryPolicy(hedge=True, on_hedge=hedges.append, max_workers=4)
+    for _ in range(50):
+        policy.observe(0.2)
+
+    def call():
+        time.sleep(0.05)
+        return 'ok'
+
+    # 24 callers on four threads: the last ones wait 0.25s for a thread, but each call takes 0.05s
+    callers = [threading.Thread(target=policy.call, args=(call,)) for _ in range(24)]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert hedges == []
+
+
+def test_slow_call_is_hedged():
+    hedges = []
+    policy = RetryPolicy(hedge=True, on_hedge=hedges.append)
+    for _ in range(50):
+        policy.observe(0.02)
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return 'slow'
+        return 'fast'
+
+    assert policy.call(call) == 'fast'
+    assert hedges == ['fired', 'won']
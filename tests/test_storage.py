@@ -0,0 +1,113 @@
+import os
+import time
+
+from storage import UploadBlob, UploadRetention, persist_upload
+
+
+def make_blob(n, size=100):
+    return UploadBlob(bytes([n]) * size, f'{n:064x}', 'image/png', '.png')
+
+
+def store(folder, retention, blob, at):
+    # As in the app: written (or its mtime bumped) and then touched, both at `at`
+    persist_upload(blob, folder)
+    os.utime(os.path.join(folder, blob.filename), (at, at))
+    retention.touch(blob.filename, len(blob.data))
+
+
+def exists(folder, blob):
+    return os.path.exists(os.path.join(folder, blob.filename))
+
+
+def make_retention(folder, now, **kwargs):
+    return UploadRetention(str(folder), background=False, clock=lambda: now[0], **kwargs)
+
+
+def test_least_recently_used_files_go_first_above_max_bytes(tmp_path):
+    now = [time.time()]
+    retention = make_retention(tmp_path, now, max_bytes=250)
+    blobs = [make_blob(n) for n in range(3)]
+    for blob in blobs:
+        store(tmp_path, retention, blob, now[0])
+        now[0] += 1
+    retention.touch(blobs[0].filename)
+
+    assert retention.sweep() == 1
+    assert [exists(tmp_path, blob) for blob in blobs] == [True, False, True]
+    assert retention.total_bytes == 200
+
+
+def test_files_unused_for_max_age_expire(tmp_path):
+    now = [time.time()]
+    retention = make_retention(tmp_path, now, max_age=3600)
+    old, fresh = make_blob(1), make_blob(2)
+    store(tmp_path, retention, old, now[0])
+    now[0] += 3000
+    store(tmp_path, retention, fresh, now[0])
+    now[0] += 1000
+
+    retention.sweep()
+    assert not exists(tmp_path, old)
+    assert exists(tmp_path, fresh)
+
+
+def test_failed_upload_is_removed_when_nothing_else_used_it(tmp_path):
+    now = [time.time()]
+    retention = make_retention(tmp_path, now)
+    blob = make_blob(1)
+    store(tmp_path, retention, blob, now[0])
+    retention.mark_failed(blob.filename)
+
+    retention.sweep()
+    assert not exists(tmp_path, blob)
+
+
+def test_failed_upload_shared_with_another_request_is_kept(tmp_path):
+    now = [time.time()]
+    retention = make_retention(tmp_path, now)
+    blob = make_blob(1)
+    store(tmp_path, retention, blob, now[0])
+    store(tmp_path, retention, blob, now[0])
+    retention.mark_failed(blob.filename)
+
+    retention.sweep()
+    assert exists(tmp_path, blob)
+
+
+def test_failed_upload_reused_by_another_worker_is_kept(tmp_path):
+    now = [time.time() - 60]
+    worker, other = make_retention(tmp_path, now), make_retention(tmp_path, now)
+    blob = make_blob(1)
+    store(tmp_path, worker, blob, now[0])
+    now[0] += 1
+    # The other worker stores the same digest later, which bumps the file's mtime
+    store(tmp_path, other, blob, now[0])
+    worker.mark_failed(blob.filename)
+
+    worker.sweep()
+    assert exists(tmp_path, blob)
+
+
+def test_sweep_counts_files_written_by_other_workers(tmp_path):
+    now = [time.time()]
+    worker, other = make_retention(tmp_path, now, max_bytes=150), make_retention(tmp_path, now)
+    first, second = make_blob(1), make_blob(2)
+    store(tmp_path, other, first, now[0] - 10)
+    store(tmp_path, other, second, now[0] - 5)
+
+    assert worker.sweep() == 1
+    assert not exists(tmp_path, first)
+    assert exists(tmp_path, second)
+
+
+def test_names_that_are_not_digests_are_left_alone(tmp_path):
+    now = [time.time()]
+    retention = make_retention(tmp_path, now, max_bytes=0, max_age=0)
+    for name in ('photo.jpg', 'notes.txt', 'abc123.png'):
+        path = tmp_path / name
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (now[0] - 10 ** 6, now[0] - 10 ** 6))
+    now[0] += 10
+
+    assert retention.sweep() == 0
+    assert sorted(os.listdir(tmp_path)) == ['abc123.png', 'notes.txt', 'photo.jpg']
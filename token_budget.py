@@ -0,0 +1,39 @@
+import math
+import threading
+from collections import deque
+
+_ROUND_TO = 64
+
+
+class OutputTokenBudget:
+    """max_output_tokens sized from the lengths of recent answers.
+
+    Until min_samples complete answers have been observed the ceiling is
+    used. After that the cap is the `quantile` of recent candidate token
+    counts times `headroom`, rounded up to a multiple of 64 and kept within
+    [floor, ceiling]. Truncated answers are not observed (their true length
+    is unknown); callers retry them once at the ceiling.
+    """
+
+    def __init__(self, ceiling, floor=256, quantile=0.99, headroom=1.25, min_samples=20, window=500):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.quantile = quantile
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._current = ceiling
+
+    def observe(self, candidate_tokens):
+        with self._lock:
+            self._samples.append(candidate_tokens)
+            if len(self._samples) < self.min_samples:
+                return
+            ordered = sorted(self._samples)
+            tokens = ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+            cap = math.ceil(tokens * self.headroom / _ROUND_TO) * _ROUND_TO
+            self._current = max(self.floor, min(self.ceiling, cap))
+
+    def current(self):
+        return self._current
@@ -0,0 +1,84 @@
+"""Fail when the web-only path gets expensive to cold start.
+
+Imports the Vercel entry point (api/index.py) in a fresh interpreter, serves
+/health and / once, and checks that:
+
+  * importing the app plus those two requests stays under --budget-ms, and
+  * none of the model SDK's heavy dependencies were imported along the way.
+
+    python tools/check_import_budget.py --budget-ms 400
+
+Exits with status 1 on a violation, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load once a request needs the model
+HEAVY_MODULES = (
+    'google.generativeai',
+    'google.api_core',
+    'google.protobuf',
+    'grpc',
+    'pydantic',
+    'PIL',
+)
+
+_PROBE = r'''
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, os.path.join({root!r}, 'api'))
+sys.path.insert(0, {root!r})
+import index
+imported = time.perf_counter()
+client = index.app.test_client()
+statuses = [client.get('/health').status_code, client.get('/').status_code]
+served = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'total_ms': (served - started) * 1000,
+    'statuses': statuses,
+    'heavy': [m for m in {heavy!r} if m in sys.modules],
+}}))
+'''
+
+
+def probe(python=sys.executable):
+    code = _PROBE.format(root=ROOT, heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([python, '-c', code], capture_output=True, text=True, env=env, cwd=ROOT)
+    if result.returncode != 0:
+        raise SystemExit(f'Probe failed:\n{result.stderr}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', '400')))
+    parser.add_argument('--runs', type=int, default=3, help='take the fastest of N fresh interpreters')
+    args = parser.parse_args(argv)
+
+    runs = [probe() for _ in range(max(1, args.runs))]
+    best = min(runs, key=lambda r: r['total_ms'])
+    heavy = sorted({m for r in runs for m in r['heavy']})
+    print(f"import {best['import_ms']:.1f} ms, import + /health + / {best['total_ms']:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms), statuses {best['statuses']}")
+
+    failures = []
+    if best['total_ms'] > args.budget_ms:
+        failures.append(f"cold start {best['total_ms']:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    if heavy:
+        failures.append('web-only path imported: ' + ', '.join(heavy))
+    if any(status != 200 for status in best['statuses']):
+        failures.append(f"unexpected statuses {best['statuses']}")
+    for failure in failures:
+        print(f'FAIL: {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Export the UI as plain static files for the CDN.
+
+Renders templates/index.html through the Flask app and writes it, together
+with everything under static/ except uploads (plus content-hashed copies
+under assets/ for asset_url()), to the output directory:
+
+    python tools/export_static.py --out public
+
+vercel.json runs this as its build step and serves the output directly, so
+page loads never start the Python function. Only the API routes are sent
+to api/index.py.
+"""
+import argparse
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Runtime data, not part of the UI
+_SKIP_STATIC = ('uploads',)
+
+
+def render_index():
+    from app import _render_index, app
+
+    with app.test_request_context('/'):
+        return _render_index()
+
+
+def export(out_dir):
+    out_dir = os.path.abspath(out_dir)
+    if out_dir == ROOT or os.path.exists(os.path.join(out_dir, 'app.py')):
+        raise SystemExit(f'Refusing to export into the project directory: {out_dir}')
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8', newline='') as f:
+        f.write(render_index())
+
+    static_src = os.path.join(ROOT, 'static')
+    if os.path.isdir(static_src):
+        shutil.copytree(
+            static_src,
+            os.path.join(out_dir, 'static'),
+            ignore=lambda src, names: [n for n in names if src == static_src and n in _SKIP_STATIC],
+        )
+
+    # Fingerprinted copies for asset_url(); served with an immutable Cache-Control
+    from app import app
+    from assets import fingerprinted_name
+
+    for dirpath, dirnames, filenames in os.walk(static_src):
+        if dirpath == static_src:
+            dirnames[:] = [d for d in dirnames if d not in _SKIP_STATIC]
+        for filename in filenames:
+            name = os.path.relpath(os.path.join(dirpath, filename), static_src).replace(os.sep, '/')
+            target = os.path.join(out_dir, 'assets', fingerprinted_name(app.static_folder, name))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(os.path.join(dirpath, filename), target)
+
+    written = []
+    for dirpath, _, filenames in os.walk(out_dir):
+        written.extend(os.path.relpath(os.path.join(dirpath, n), out_dir) for n in filenames)
+    return sorted(written)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=os.path.join(ROOT, 'public'))
+    args = parser.parse_args(argv)
+
+    for path in export(args.out):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""Local stand-in for the Gemini REST API, for load tests and benchmarks.
+
+Implements the two calls app.py makes:
+
+    POST /v1beta/models/<model>:generateContent
+    POST /v1beta/models/<model>:streamGenerateContent
+
+Point the app at it through client_options:
+
+    python tools/fake_gemini.py --port 8089 --latency lognormal:1500:0.4 --error-rate 0.02
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 GEMINI_API_KEY=fake python app.py
+
+--key-rps gives every API key its own quota (429 once exceeded), to measure
+how throughput scales with GEMINI_API_KEYS.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_RESPONSE = """Visual Evidence: Superficial linear scratches on the forearm with mild surrounding redness.
+Assessment: Minor abrasions / superficial scratches.
+Immediate First Aid: Wash with clean running water and mild soap. Apply an antiseptic. Cover with a sterile dressing.
+When to Seek Medical Care: If redness spreads, pus appears, fever develops, or the scratch came from an animal.
+Trusted India Resources: https://www.mohfw.gov.in, https://www.nhp.gov.in
+Helpline (India): Emergency number 108
+Confidence: High
+Disclaimer: This is first-aid guidance only, not medical diagnosis.
+"""
+
+_ERRORS = {
+    429: 'RESOURCE_EXHAUSTED',
+    500: 'INTERNAL',
+    503: 'UNAVAILABLE',
+}
+
+_PATH = re.compile(r'^/v1beta/(?P<model>(?:tuned)?[mM]odels/[^:]+):(?P<method>generateContent|streamGenerateContent)$')
+
+
+def parse_latency(spec):
+    """Build a sampler (seconds) from 'fixed:MS', 'uniform:LO:HI', 'exp:MEAN_MS' or 'lognormal:MEDIAN_MS:SIGMA'."""
+    kind, *args = spec.split(':')
+    values = [float(a) for a in args]
+    if kind == 'fixed':
+        return lambda: values[0] / 1000
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == 'exp':
+        return lambda: random.expovariate(1000 / values[0])
+    if kind == 'lognormal':
+        return lambda: random.lognormvariate(math.log(values[0] / 1000), values[1])
+    raise argparse.ArgumentTypeError(f'Unknown latency distribution: {spec}')
+
+
+def build_text(size):
+    if size <= 0:
+        return SAMPLE_RESPONSE
+    repeats = size // len(SAMPLE_RESPONSE) + 1
+    return (SAMPLE_RESPONSE * repeats)[:size]
+
+
+def response_body(text, finish_reason='STOP', prompt_tokens=600, generated_chars=None):
+    # Stream chunks report cumulative usage, like the real API
+    candidate_tokens = max(1, (len(text) if generated_chars is None else generated_chars) // 4)
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': 'model'},
+            'finishReason': finish_reason,
+            'index': 0,
+        }],
+        'usageMetadata': {
+            'promptTokenCount': prompt_tokens,
+            'candidatesTokenCount': candidate_tokens,
+            'totalTokenCount': prompt_tokens + candidate_tokens,
+        },
+    }
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeGemini/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.options.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def do_POST(self):
+        options = self.server.options
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length)
+
+        match = _PATH.match(self.path.split('?', 1)[0])
+        if not match:
+            self._send_json(404, {'error': {'code': 404, 'message': f'Unknown path {self.path}', 'status': 'NOT_FOUND'}})
+            return
+
+        self.server.count_request()
+        api_key = self.headers.get('x-goog-api-key') or ''
+        if not self.server.within_quota(api_key):
+            self._send_json(429, {'error': {'code': 429, 'message': 'Quota exceeded for this key', 'status': _ERRORS[429]}})
+            return
+        prompt_tokens = 258 + len(request_body) // 400
+        latency = options.latency()
+
+        if random.random() < options.error_rate:
+            time.sleep(latency * random.random())
+            status = random.choice(options.error_codes)
+            self._send_json(status, {'error': {'code': status, 'message': 'Injected failure', 'status': _ERRORS[status]}})
+            return
+
+        text = build_text(options.response_chars)
+        if match['method'] == 'generateContent':
+            time.sleep(latency)
+            self._send_json(200, response_body(text, prompt_tokens=prompt_tokens))
+            return
+
+        # Streamed responses are a JSON array of GenerateContentResponse objects
+        chunks = max(1, options.stream_chunks)
+        step = math.ceil(len(text) / chunks)
+        pieces = [text[i:i + step] for i in range(0, len(text), step)]
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        sent = 0
+        for i, piece in enumerate(pieces):
+            sent += len(piece)
+            time.sleep(latency / len(pieces))
+            last = i == len(pieces) - 1
+            body = response_body(piece, finish_reason='STOP' if last else 'FINISH_REASON_UNSPECIFIED',
+                                 prompt_tokens=prompt_tokens, generated_chars=sent)
+            prefix = b'[' if i == 0 else b',\r\n'
+            self._write_chunk(prefix + json.dumps(body).encode('utf-8') + (b']' if last else b''))
+        self._write_chunk(b'')
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options):
+        super().__init__(address, FakeGeminiHandler)
+        self.options = options
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._key_calls = {}  # api key -> deque of request times in the last second
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def within_quota(self, api_key):
+        if not self.options.key_rps:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            calls = self._key_calls.setdefault(api_key, deque())
+            while calls and now - calls[0] > 1.0:
+                calls.popleft()
+            if len(calls) >= self.options.key_rps:
+                return False
+            calls.append(now)
+            return True
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=parse_latency, default='lognormal:1500:0.35',
+                        help="fixed:MS, uniform:LO:HI, exp:MEAN_MS or lognormal:MEDIAN_MS:SIGMA")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls that fail')
+    parser.add_argument('--error-codes', type=lambda s: [int(c) for c in s.split(',')], default=[429, 503],
+                        help='comma-separated HTTP statuses to inject (429, 500, 503)')
+    parser.add_argument('--response-chars', type=int, default=0,
+                        help='length of the generated text (0 = one sample response)')
+    parser.add_argument('--stream-chunks', type=int, default=8)
+    parser.add_argument('--key-rps', type=float, default=0,
+                        help='requests per second allowed per API key before 429 (0 = unlimited)')
+    parser.add_argument('--verbose', action='store_true')
+    return parser
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    server = FakeGeminiServer((options.host, options.port), options)
+    print(f'Fake Gemini listening on http://{options.host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""Closed-loop load generator for /analyze.
+
+Runs a fixed number of requests at each concurrency level, then reports
+throughput and latency percentiles. Pair it with tools/fake_gemini.py so the
+numbers are reproducible and don't spend real quota:
+
+    python tools/fake_gemini.py --latency lognormal:1500:0.35 &
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089 GEMINI_API_KEY=fake python app.py &
+    python tools/loadtest.py --url http://127.0.0.1:5000/analyze --concurrency 1,4,16,64
+
+By default every request gets a few random trailing bytes (a new upload
+digest) and a unique tag on its description. The description is part of
+both the response cache key and the near-duplicate lookup, which hashes
+decoded pixels and so ignores the trailing bytes. Neither cache can
+short-circuit the model call. Pass --allow-cache to measure cache hits
+instead.
+"""
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_IMAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'static', 'uploads', 'Cat_scratches_in_arm_20210220_000618_618.jpg',
+)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float('nan')
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def multipart_body(image, filename, description):
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="description"\r\n\r\n{description}\r\n'.encode(),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode() + image + b'\r\n',
+        f'--{boundary}--\r\n'.encode(),
+    ]
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class Worker(threading.local):
+    # One keep-alive connection per thread
+    conn = None
+
+
+def run_level(url, image, filename, description, concurrency, requests, unique, timeout):
+    target = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+    local = Worker()
+
+    def one_request(_):
+        payload = image + os.urandom(16) if unique else image
+        text = f'{description} [{uuid.uuid4().hex[:12]}]' if unique else description
+        body, content_type = multipart_body(payload, filename, text)
+        started = time.perf_counter()
+        try:
+            if local.conn is None:
+                local.conn = conn_cls(target.netloc, timeout=timeout)
+            local.conn.request('POST', target.path or '/', body=body, headers={'Content-Type': content_type})
+            response = local.conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            if local.conn is not None:
+                local.conn.close()
+            local.conn = None
+            status = 0
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(elapsed for status, elapsed in results if status == 200)
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'ok': len(latencies),
+        'errors': requests - len(latencies),
+        'statuses': statuses,
+        'rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else float('nan'),
+        'wall_s': wall,
+    }
+
+
+def print_table(rows, out=sys.stdout):
+    header = f"{'conc':>5} {'reqs':>6} {'ok':>6} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header, file=out)
+    print('-' * len(header), file=out)
+    for r in rows:
+        print(f"{r['concurrency']:>5} {r['requests']:>6} {r['ok']:>6} {r['errors']:>5} {r['rps']:>8.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5000/analyze')
+    parser.add_argument('--image', default=DEFAULT_IMAGE)
+    parser.add_argument('--description', default='Scratch on forearm from a cat')
+    parser.add_argument('--concurrency', default='1,2,4,8,16,32',
+                        help='comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=0,
+                        help='requests per level (default: 10 x concurrency, at least 20)')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--allow-cache', action='store_true',
+                        help='send identical bytes and description every time so response caches can hit')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    with open(args.image, 'rb') as f:
+        image = f.read()
+    filename = os.path.basename(args.image)
+
+    rows = []
+    for level in (int(c) for c in args.concurrency.split(',')):
+        requests = args.requests or max(20, level * 10)
+        row = run_level(args.url, image, filename, args.description, level, requests,
+                        unique=not args.allow_cache, timeout=args.timeout)
+        rows.append(row)
+        print(f"concurrency {level}: {row['ok']}/{requests} ok, {row['rps']:.2f} req/s, "
+              f"p99 {row['p99_ms']:.1f} ms, statuses {row['statuses']}", file=sys.stderr)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
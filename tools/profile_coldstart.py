@@ -0,0 +1,202 @@
+"""Cold-start profile of the Vercel entry point (api/index.py).
+
+Loads api/index.py in a fresh interpreter with `-X importtime`. Then, in
+the same process, it serves /health, / and /analyze (against
+tools/fake_gemini.py, started here) and reports:
+
+  * a per-module import-time tree, plus totals per top-level package, which
+    shows which packages under Lib/site-packages dominate the cold start
+  * time to first byte of each request, measured from interpreter start
+  * peak RSS of the process
+
+    python tools/profile_coldstart.py
+    python tools/profile_coldstart.py --min-ms 5 --depth 3 --json coldstart.json
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_IMAGE = os.path.join(ROOT, 'static', 'uploads', 'Cat_scratches_in_arm_20210220_000618_618.jpg')
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$')
+
+_PROBE = r'''
+import time
+started = time.perf_counter()
+import io, json, os, resource, sys
+sys.path.insert(0, os.path.join({root!r}, 'api'))
+sys.path.insert(0, {root!r})
+import index
+imported = time.perf_counter()
+
+client = index.app.test_client()
+with open({image!r}, 'rb') as f:
+    image = f.read()
+requests = [
+    ('/health', lambda: client.get('/health')),
+    ('/', lambda: client.get('/')),
+    ('/analyze', lambda: client.post('/analyze', data={{'image': (io.BytesIO(image), 'probe.jpg')}})),
+]
+timings = []
+for path, call in requests:
+    begin = time.perf_counter()
+    response = call()
+    response.get_data()
+    end = time.perf_counter()
+    timings.append({{
+        'path': path,
+        'status': response.status_code,
+        'request_ms': (end - begin) * 1000,
+        'ttfb_since_start_ms': (end - started) * 1000,
+    }})
+
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss is KiB on Linux, bytes on macOS
+peak_kib = peak / 1024 if sys.platform == 'darwin' else peak
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'requests': timings,
+    'peak_rss_mib': peak_kib / 1024,
+}}))
+'''
+
+
+def parse_importtime(stderr):
+    """Turn `-X importtime` output into a tree of {name, self_ms, cumulative_ms, children}."""
+    root = {'name': '<root>', 'self_ms': 0.0, 'cumulative_ms': 0.0, 'children': []}
+    # importtime prints children before their parent, indented one level deeper
+    pending = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = {
+            'name': name,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+            'children': pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    root['children'] = pending.get(0, [])
+    root['cumulative_ms'] = sum(child['cumulative_ms'] for child in root['children'])
+    return root
+
+
+def package_totals(tree):
+    totals = {}
+
+    def walk(node):
+        for child in node['children']:
+            top = child['name'].split('.')[0]
+            if top == 'google':
+                # Split the google namespace into its real distributions
+                top = '.'.join(child['name'].split('.')[:2])
+            totals[top] = totals.get(top, 0.0) + child['self_ms']
+            walk(child)
+
+    walk(tree)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def print_tree(node, min_ms, max_depth, depth=0, out=sys.stdout):
+    for child in sorted(node['children'], key=lambda c: c['cumulative_ms'], reverse=True):
+        if child['cumulative_ms'] < min_ms:
+            continue
+        print(f"{child['cumulative_ms']:9.1f} {child['self_ms']:8.1f}  {'  ' * depth}{child['name']}", file=out)
+        if depth + 1 < max_depth:
+            print_tree(child, min_ms, max_depth, depth + 1, out)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise SystemExit(f'Fake Gemini did not start on port {port}')
+
+
+def run_profile(image, fake_latency):
+    port = _free_port()
+    fake = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'tools', 'fake_gemini.py'), '--port', str(port),
+         '--latency', fake_latency],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(port)
+        env = dict(
+            os.environ,
+            PYTHONDONTWRITEBYTECODE='1',
+            GEMINI_API_ENDPOINT=f'http://127.0.0.1:{port}',
+            GEMINI_API_KEY=os.getenv('GEMINI_API_KEY', 'fake'),
+            UPLOAD_PERSISTENCE='off',
+        )
+        code = _PROBE.format(root=ROOT, image=image)
+        spawned = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                capture_output=True, text=True, env=env, cwd=ROOT)
+        wall_ms = (time.perf_counter() - spawned) * 1000
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    if result.returncode != 0:
+        raise SystemExit(f'Probe failed:\n{result.stderr[-4000:]}')
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['process_wall_ms'] = wall_ms
+    report['import_tree'] = parse_importtime(result.stderr)
+    report['package_self_ms'] = package_totals(report['import_tree'])
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--image', default=DEFAULT_IMAGE)
+    parser.add_argument('--fake-latency', default='fixed:0',
+                        help='latency of the stand-in model (see tools/fake_gemini.py)')
+    parser.add_argument('--min-ms', type=float, default=2.0, help='hide tree nodes cheaper than this')
+    parser.add_argument('--depth', type=int, default=4, help='maximum tree depth to print')
+    parser.add_argument('--top', type=int, default=15, help='packages to list in the summary')
+    parser.add_argument('--json', metavar='PATH', help='also write the full report as JSON')
+    args = parser.parse_args(argv)
+
+    report = run_profile(args.image, args.fake_latency)
+
+    print(f"Import api/index.py: {report['import_ms']:.1f} ms "
+          f"(import tree incl. request-time imports {report['import_tree']['cumulative_ms']:.1f} ms)")
+    for request in report['requests']:
+        print(f"  {request['path']:<9} status {request['status']}  request {request['request_ms']:8.1f} ms  "
+              f"first byte at {request['ttfb_since_start_ms']:8.1f} ms since start")
+    print(f"Peak RSS: {report['peak_rss_mib']:.1f} MiB; process wall time {report['process_wall_ms']:.1f} ms")
+
+    print(f"\nSelf import time by package (top {args.top}):")
+    for package, ms in report['package_self_ms'][:args.top]:
+        print(f'{ms:9.1f} ms  {package}')
+
+    print(f"\nImport tree (cumulative ms, self ms; >= {args.min_ms} ms, depth {args.depth}):")
+    print_tree(report['import_tree'], args.min_ms, args.depth)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()